@@ -0,0 +1,301 @@
+"""Benchmark jalur-jalur lambat dashboard pada beberapa ukuran dataset sintetis.
+
+Contoh (dari root repo):
+
+    python benchmarks/run.py --sizes 1000 100000 1000000
+    python benchmarks/run.py --save-baseline      # simpan hasil sebagai baseline
+    python benchmarks/run.py                      # bandingkan dengan baseline
+
+Setiap kasus dicatat waktu (terbaik dari --repeat), memori puncak (tracemalloc)
+dan throughput ke benchmarks/results.json. Kasus yang lebih lambat atau lebih
+boros memori dari baseline melebihi --threshold ditandai sebagai regresi dan
+membuat proses keluar dengan kode 1.
+
+Waktu hanya sebanding di mesin yang sama, jadi baseline tidak disimpan di
+repo: buat dulu dengan --save-baseline di mesin yang dipakai untuk cek
+regresi (metadata mesin ikut disimpan). Tanpa baseline, cek regresi dilewati.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from home import DATA_INFO  # noqa: E402
+
+RESULTS_PATH = os.path.join(ROOT, 'benchmarks', 'results.json')
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+# Nilai kategori mengikuti pilihan di form halaman Prediksi
+CATEGORIES = {
+    'Month': ['Feb', 'Mar', 'May', 'June', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+    'OperatingSystems': list(range(1, 9)),
+    'Browser': list(range(1, 14)),
+    'Region': list(range(1, 10)),
+    'TrafficType': list(range(1, 21)),
+    'VisitorType': ['Returning_Visitor', 'New_Visitor', 'Other']
+}
+
+
+def synthetic_dataset(n, seed=0):
+    """Dataset sintetis dengan kolom dan tipe dari skema DATA_INFO di home.py."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for name, tipe, _ in DATA_INFO:
+        if tipe == 'Numerik':
+            if name.endswith('Duration'):
+                data[name] = np.round(rng.exponential(200.0, n) * (rng.random(n) < 0.7), 2)
+            elif name.endswith('Rates'):
+                data[name] = np.round(rng.beta(1, 20, n), 4)
+            elif name == 'PageValues':
+                data[name] = np.round(rng.exponential(25.0, n) * (rng.random(n) < 0.25), 2)
+            elif name == 'SpecialDay':
+                data[name] = rng.choice([0.0, 0.2, 0.4, 0.6, 0.8, 1.0], n, p=[0.9, 0.02, 0.02, 0.02, 0.02, 0.02])
+            else:
+                data[name] = rng.poisson(3 if name == 'ProductRelated' else 1, n) * (10 if name == 'ProductRelated' else 1)
+        elif tipe == 'Kategorikal':
+            data[name] = rng.choice(CATEGORIES[name], n)
+        else:
+            data[name] = rng.random(n) < (0.15 if name == 'Revenue' else 0.23)
+    return pd.DataFrame(data)
+
+
+def measure(func, repeat):
+    """Waktu terbaik dari `repeat` kali dan memori puncak Python (tracemalloc) satu kali jalan."""
+    # Pemanasan: import lazy dan cache internal tidak ikut terukur
+    func()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+class Fixtures:
+    """Data dan objek untuk kasus-kasus satu ukuran dataset, dibuat saat pertama dipakai.
+
+    Dengan --cases hanya persiapan yang dibutuhkan kasus terpilih yang
+    dijalankan (misalnya file CSV/Arrow tidak ditulis untuk kasus model).
+    """
+
+    def __init__(self, df, workdir, model_path):
+        self.df = df
+        self.n = len(df)
+        self.workdir = workdir
+        self.model_path = model_path
+
+    @functools.cached_property
+    def csv_path(self):
+        path = os.path.join(self.workdir, f'data_{self.n}.csv')
+        self.df.to_csv(path, index=False)
+        return path
+
+    @functools.cached_property
+    def arrow_path(self):
+        import dataset
+        path = os.path.join(self.workdir, f'data_{self.n}.arrow')
+        dataset.convert(self.csv_path, path)
+        return path
+
+    @functools.cached_property
+    def store(self):
+        import eda_aggregates
+        store = eda_aggregates.AggregateStore(self.csv_path)
+        store.add_chunk(self.df)
+        return store
+
+    @functools.cached_property
+    def dominant(self):
+        import eda
+        return eda.dominant_section_table(self.df)
+
+    @functools.cached_property
+    def X(self):
+        from model_registry import FEATURE_COLUMNS
+        return self.df[FEATURE_COLUMNS]
+
+    @functools.cached_property
+    def model(self):
+        return _load_model(self.model_path)
+
+    @functools.cached_property
+    def compiled(self):
+        return _load_compiled(self.model_path) if self.model is not None else None
+
+
+def _data_cases(fx):
+    import dataset
+    import eda
+    import eda_aggregates
+
+    yield 'read_csv', lambda: (lambda: pd.read_csv(fx.csv_path), fx.n)
+    yield 'load_dataset_arrow', lambda: (
+        lambda: dataset.load_dataset(arrow_path=fx.arrow_path, csv_path=fx.csv_path), fx.n)
+    yield 'aggregate_add_chunk', lambda: (lambda: eda_aggregates.AggregateStore(fx.csv_path).add_chunk(fx.df), fx.n)
+    yield 'point_biserial_table', lambda: (lambda: eda_aggregates.point_biserial_table(fx.store), fx.n)
+    yield 'cramers_v_table', lambda: (lambda: eda_aggregates.cramers_v_table(fx.store), fx.n)
+    yield 'dominant_section_table', lambda: (lambda: eda.dominant_section_table(fx.df), fx.n)
+
+    figures = [
+        ('fig_point_biserial', lambda: eda.plot_point_biserial(eda_aggregates.point_biserial_table(fx.store))),
+        ('fig2_cramers_v', lambda: eda.plot_cramers_v(eda_aggregates.cramers_v_table(fx.store))),
+        ('fig3_pagevalues_distribution', lambda: eda.plot_pagevalues_distribution(fx.df)),
+        ('fig4_dominant_section', lambda: eda.plot_dominant_section(fx.dominant)),
+        ('fig5_month_conversion', lambda: eda.plot_month_conversion(eda_aggregates.month_conversion_table(fx.store))),
+        ('fig6_month_weekend', lambda: eda.plot_month_weekend(eda_aggregates.month_weekend_pivot(fx.store))),
+        ('fig7_visitor_type', lambda: eda.plot_visitor_type(eda_aggregates.visitor_type_shares(fx.store))),
+        ('fig8_new_visitor_month', lambda: eda.plot_new_visitor_month(eda_aggregates.new_visitor_month_table(fx.store)))
+    ]
+    for name, build in figures:
+        yield name, lambda build=build: (lambda: eda.render_png(build()), fx.n)
+
+
+def _prediction_cache_case(fx):
+    # Jalur hit cache hasil prediksi: biaya kunci kanonik dan lookup tanpa model
+    from prediction_cache import PredictionCache
+    records = fx.X.head(10_000).to_dict('records')
+    cache = PredictionCache(max_entries=len(records))
+    cache.predict_many(records, lambda unique: [(0, 0.0)] * len(unique), 'benchmark')
+    return lambda: cache.predict_many(records, None, 'benchmark'), len(records)
+
+
+def _model_cases(fx):
+    from model_registry import ModelRegistry
+
+    def needs_model(build):
+        # None: model tidak dapat dimuat (misalnya masih pointer Git LFS)
+        return lambda: build() if fx.model is not None else None
+
+    def needs_compiled(build):
+        return lambda: build() if fx.compiled is not None else None
+
+    yield 'model_load', needs_model(lambda: (lambda: ModelRegistry(fx.model_path).get(), 1))
+    yield 'model_predict_one', needs_model(lambda: (functools.partial(fx.model.predict, fx.X.head(1)), 1))
+    yield 'model_predict_batch', needs_model(lambda: (functools.partial(fx.model.predict, fx.X), fx.n))
+    yield 'compiled_predict_one', needs_compiled(
+        lambda: (functools.partial(fx.compiled.predict_one, fx.X.iloc[0].to_dict()), 1))
+    yield 'compiled_predict_batch', needs_compiled(lambda: (functools.partial(fx.compiled.predict, fx.X), fx.n))
+
+
+def cases(fx):
+    """(nama, persiapan) untuk satu ukuran dataset. `persiapan()` membuat data yang
+    dibutuhkan dan mengembalikan (fungsi, jumlah baris), atau None jika kasus dilewati."""
+    yield from _data_cases(fx)
+    yield 'prediction_cache_hit', lambda: _prediction_cache_case(fx)
+    yield from _model_cases(fx)
+
+
+def _load_model(model_path):
+    from model_registry import ModelRegistry
+    try:
+        return ModelRegistry(model_path).get()
+    except Exception as exc:
+        # Misalnya file masih berupa pointer Git LFS
+        print(f'Lewati benchmark model: {model_path} tidak dapat dimuat ({exc})')
+        return None
+
+
+def _load_compiled(model_path):
+    from compiled_model import get_compiled_model
+    from model_registry import file_sha256
+    return get_compiled_model(file_sha256(model_path))
+
+
+def compare(results, baseline, threshold):
+    reference = {(r['case'], r['rows_dataset']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = reference.get((result['case'], result['rows_dataset']))
+        if base is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if base[metric] > 0 and result[metric] > base[metric] * threshold:
+                regressions.append({
+                    'case': result['case'], 'rows_dataset': result['rows_dataset'], 'metric': metric,
+                    'baseline': base[metric], 'current': result[metric], 'ratio': result[metric] / base[metric]
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark jalur lambat dashboard')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cases', nargs='*', help='Hanya jalankan kasus dengan nama ini')
+    parser.add_argument('--model', default=os.path.join(ROOT, 'src', 'model_terbaik.pkl'))
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Simpan hasil sebagai baseline baru')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Rasio terhadap baseline yang dianggap regresi')
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            df = synthetic_dataset(size)
+            for name, prepare in cases(Fixtures(df, workdir, args.model)):
+                if args.cases and name not in args.cases:
+                    continue
+                case = prepare()
+                if case is None:
+                    continue
+                func, rows = case
+                seconds, peak = measure(func, args.repeat)
+                results.append({'case': name, 'rows_dataset': size, 'rows': rows, 'seconds': seconds,
+                                'peak_bytes': peak, 'rows_per_second': rows / seconds if seconds > 0 else None})
+                print(f'{name:<30} {size:>9} baris  {seconds * 1e3:10.2f} ms  '
+                      f'{peak / 1e6:9.1f} MB  {rows / seconds:14,.0f} baris/detik')
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline disimpan ke {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report['regressions'] = compare(results, json.load(f), args.threshold)
+    else:
+        print(f'Baseline {args.baseline} belum ada, cek regresi dilewati. '
+              'Jalankan dulu dengan --save-baseline di mesin yang sama.')
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for regression in report.get('regressions', []):
+        print(f"REGRESI {regression['case']} ({regression['rows_dataset']} baris) {regression['metric']}: "
+              f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['ratio']:.2f}x)")
+    if report.get('regressions'):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_MB = float(os.environ.get('EDA_CACHE_MAX_MB', 256))
+# Awalan kunci yang bukan hash dataset (token AggregateStore), tidak dibuang saat
+# hash dataset berubah
+NON_DATASET_PREFIXES = ('agg:',)
+
+
+def _estimate_nbytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class AnalyticsCache:
+    """Cache LRU bersama untuk hasil analisis EDA, dikunci dengan hash isi dataset.
+
+    Entri dari dataset lama dibuang saat hash dataset berubah, dan entri yang
+    paling lama tidak dipakai dibuang saat total ukuran melewati `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=int(DEFAULT_MAX_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._compute_locks = {}
+        self._file_hashes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def dataset_hash(self, path):
+        # Hash isi file hanya dihitung ulang saat ukuran/mtime berubah
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._file_hashes.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self._file_hashes[path] = (signature, digest)
+        self._evict_other_datasets(path, digest)
+        return digest
+
+    def get_or_compute(self, dataset_hash, name, compute):
+        key = (dataset_hash, name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            compute_lock = self._compute_locks.setdefault(key, threading.Lock())
+
+        # Sesi lain yang meminta entri yang sama menunggu hasil komputasi pertama
+        with compute_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+            value = compute()
+            nbytes = _estimate_nbytes(value)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = (value, nbytes)
+                self.total_bytes += nbytes
+                self._compute_locks.pop(key, None)
+                self._evict_over_limit()
+        return value
+
+    def _evict_over_limit(self):
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.total_bytes -= nbytes
+
+    def _evict_other_datasets(self, path, digest):
+        # Hanya entri berkunci hash dataset. Entri agregat ('agg:...') dikelola drop_stale
+        active_hashes = {h for p, (_, h) in self._file_hashes.items() if p != path}
+        with self._lock:
+            for key in list(self._entries):
+                if key[0].startswith(NON_DATASET_PREFIXES):
+                    continue
+                if key[0] != digest and key[0] not in active_hashes:
+                    _, nbytes = self._entries.pop(key)
+                    self.total_bytes -= nbytes
+
+    def drop_stale(self, prefix, current_key):
+        # Buang entri versi lama untuk kunci non-dataset (mis. token agregat EDA)
+        with self._lock:
+            for key in list(self._entries):
+                if key[0].startswith(prefix) and key[0] != current_key:
+                    _, nbytes = self._entries.pop(key)
+                    self.total_bytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalyticsCache()
+    return _cache
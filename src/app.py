@@ -1,13 +1,12 @@
 import streamlit as st
-import eda, predict, home
+from startup_timing import timed_import
+import instrumentation
+# add_custom_features harus tersedia di __main__ (app.py) karena pipeline di
+# model_terbaik.pkl mereferensikannya sebagai __main__.add_custom_features
+from features import add_custom_features  # noqa: F401
 
-def add_custom_features(df):
-    df = df.copy()
-    df['total_pages'] = df['Administrative'] + df['Informational'] + df['ProductRelated']
-    df['total_duration'] = df['Administrative_Duration'] + df['Informational_Duration'] + df['ProductRelated_Duration']
-    df['engagement_score_pages'] = df['PageValues'] + df['total_pages']
-    df['engagement_score_duration'] = df['PageValues'] + df['total_duration']
-    return df
+# Modul halaman baru diimpor saat halamannya dipilih
+PAGES = {'Home': 'home', 'EDA': 'eda', 'Prediksi': 'predict'}
 
 st.set_page_config(page_title='VISUALISASI MILESTOME 2',
                    layout='centered',
@@ -15,16 +14,17 @@ st.set_page_config(page_title='VISUALISASI MILESTOME 2',
 
 with st.sidebar:
     st.write('# Navigation')
-    navigation = st.radio('Page', ['Home', 'EDA', 'Prediksi'])
+    navigation = st.radio('Page', list(PAGES))
     st.markdown("---")
 
     # Kontak
     st.markdown("Project Data Science oleh<br><a href='https://www.linkedin.com/in/arvinwibowo/'>Arvin Surya Wibowo</a>", unsafe_allow_html=True)
 
 
-if navigation == 'Home':
-    home.run()
-elif navigation == 'EDA':
-    eda.run()
-else:
-    predict.run()
\ No newline at end of file
+# Setiap eksekusi halaman diukur per tahap (instrumentation.py), ringkasannya
+# tersedia di endpoint metrik lokal dan sebagai log JSON
+instr = instrumentation.setup()
+with instr.page_run(navigation):
+    with instr.stage('import'):
+        page = timed_import(PAGES[navigation])
+    page.run()
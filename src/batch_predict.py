@@ -0,0 +1,135 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from model_registry import FEATURE_COLUMNS, MODEL_PATH, ModelRegistry, get_registry, predicted_classes
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _file_format(name):
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext == '.csv':
+        return 'csv'
+    if ext == '.arrow':
+        return 'arrow'
+    raise ValueError(f'Format file tidak didukung: {name} (gunakan .csv, .parquet atau .arrow)')
+
+
+def iter_chunks(source, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    if fmt == 'csv':
+        yield from pd.read_csv(source, chunksize=chunksize)
+    elif fmt == 'arrow':
+        from dataset import open_table
+        for batch in open_table(source).to_batches(max_chunksize=chunksize):
+            chunk = batch.to_pandas()
+            # Kolom dictionary menjadi Categorical, model dilatih dengan string biasa
+            for col in chunk.select_dtypes('category').columns:
+                chunk[col] = chunk[col].astype(object)
+            yield chunk
+    else:
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(source)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+
+def score_chunk(model, chunk):
+    missing = [col for col in FEATURE_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise ValueError(f'Kolom input tidak lengkap: {missing}')
+
+    proba = model.predict_proba(chunk[FEATURE_COLUMNS])
+    result = chunk.copy(deep=False)
+    result['Prediction'] = predicted_classes(model, proba)
+    result['Probability'] = proba[:, 1]
+    return result
+
+
+class _ChunkWriter:
+    def __init__(self, target, fmt):
+        self.target = target
+        self.fmt = fmt
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self.target, mode='a' if self._wrote_header else 'w', header=not self._wrote_header, index=False)
+            self._wrote_header = True
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.target, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_file(source, target, input_format=None, output_format=None, chunksize=DEFAULT_CHUNKSIZE,
+               model=None, progress=None, max_rows=None):
+    """Skor file sesi per chunk dan tulis hasilnya bertahap ke `target`.
+
+    Dengan `max_rows` hanya baris-baris pertama yang diskor; `truncated` di
+    hasil menandai bahwa file input masih punya baris lain.
+    """
+    input_format = input_format or _file_format(getattr(source, 'name', source))
+    output_format = output_format or _file_format(target)
+    if output_format == 'arrow':
+        raise ValueError('Output .arrow tidak didukung, gunakan .csv atau .parquet')
+    if model is None:
+        model = get_registry().get()
+
+    writer = _ChunkWriter(target, output_format)
+    rows = 0
+    truncated = False
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(source, input_format, chunksize):
+            if max_rows is not None and rows + len(chunk) > max_rows:
+                chunk = chunk.iloc[:max_rows - rows]
+                truncated = True
+            if not len(chunk):
+                break
+            writer.write(score_chunk(model, chunk))
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows)
+            if truncated:
+                break
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+
+    return {
+        'rows': rows,
+        'truncated': truncated,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else float('nan')
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prediksi batch untuk file sesi pengunjung (CSV/Parquet)')
+    parser.add_argument('input', help='File input .csv, .parquet atau .arrow (lihat dataset.py)')
+    parser.add_argument('output', help='File output .csv atau .parquet')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Jumlah baris per chunk')
+    parser.add_argument('--model', default=MODEL_PATH, help='Path file model pickle')
+    args = parser.parse_args(argv)
+
+    model = ModelRegistry(args.model).get()
+    stats = score_file(args.input, args.output, chunksize=args.chunksize, model=model)
+    print(f"{stats['rows']} baris diprediksi dalam {stats['seconds']:.2f} detik "
+          f"({stats['rows_per_second']:,.0f} baris/detik)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,462 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from features import DERIVED_FEATURES, derived_features
+from model_registry import FEATURE_COLUMNS, MODEL_PATH, ModelRegistry, file_sha256
+
+COMPILED_PATH = 'src/model_compiled.npz'
+
+
+def _py(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# Ekspor pipeline sklearn/XGBoost
+
+def _column_ops(transformer):
+    """Operasi per kolom untuk satu transformer numerik yang sudah di-fit."""
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+
+    if transformer == 'passthrough' or transformer is None:
+        return lambda i: []
+    if isinstance(transformer, StandardScaler):
+        def ops(i):
+            result = []
+            if transformer.mean_ is not None and transformer.with_mean:
+                result.append(['sub', float(transformer.mean_[i])])
+            if transformer.scale_ is not None and transformer.with_std:
+                result.append(['div', float(transformer.scale_[i])])
+            return result
+        return ops
+    if isinstance(transformer, RobustScaler):
+        def ops(i):
+            result = []
+            if transformer.center_ is not None:
+                result.append(['sub', float(transformer.center_[i])])
+            if transformer.scale_ is not None:
+                result.append(['div', float(transformer.scale_[i])])
+            return result
+        return ops
+    if isinstance(transformer, MinMaxScaler):
+        return lambda i: [['mul', float(transformer.scale_[i])], ['add', float(transformer.min_[i])]]
+    if isinstance(transformer, SimpleImputer) and transformer.strategy in ('mean', 'median', 'constant', 'most_frequent'):
+        return lambda i: [['fill', float(transformer.statistics_[i])]]
+    raise NotImplementedError(f'Transformer {type(transformer).__name__} belum didukung oleh compiled_model')
+
+
+def _branch_slots(transformer, columns):
+    """Slot output untuk satu cabang ColumnTransformer, dengan urutan kolom output yang sama."""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+
+    steps = list(transformer.steps) if isinstance(transformer, Pipeline) else [(None, transformer)]
+    pre_ops = [[] for _ in columns]
+    for index, (_, step) in enumerate(steps):
+        if isinstance(step, OneHotEncoder):
+            if index != len(steps) - 1:
+                raise NotImplementedError('OneHotEncoder harus menjadi langkah terakhir cabang ColumnTransformer')
+            if any(cats is not None for cats in getattr(step, '_infrequent_indices', []) or []):
+                raise NotImplementedError('OneHotEncoder dengan kategori infrequent belum didukung')
+            slots = []
+            drop_idx = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(columns)
+            for col, ops, categories, drop in zip(columns, pre_ops, step.categories_, drop_idx):
+                for j, category in enumerate(categories):
+                    if drop is not None and j == drop:
+                        continue
+                    slots.append({'col': col, 'ops': ops, 'eq': _py(category)})
+            return slots
+        if isinstance(step, OrdinalEncoder):
+            if index != len(steps) - 1:
+                raise NotImplementedError('OrdinalEncoder harus menjadi langkah terakhir cabang ColumnTransformer')
+            unknown = step.unknown_value if step.handle_unknown == 'use_encoded_value' else None
+            return [
+                {'col': col, 'ops': ops, 'codes': [[_py(c), j] for j, c in enumerate(categories)], 'unknown': unknown}
+                for col, ops, categories in zip(columns, pre_ops, step.categories_)
+            ]
+        column_ops = _column_ops(step)
+        pre_ops = [ops + column_ops(i) for i, ops in enumerate(pre_ops)]
+    return [{'col': col, 'ops': ops} for col, ops in zip(columns, pre_ops)]
+
+
+def _column_transformer_slots(ct):
+    names_in = list(ct.feature_names_in_)
+    input_indices = ct._transformer_to_input_indices
+    slots = []
+    for name, transformer, _ in ct.transformers_:
+        if transformer == 'drop':
+            continue
+        columns = [names_in[i] for i in input_indices[name]]
+        if columns:
+            slots.extend(_branch_slots(transformer, columns))
+    return slots
+
+
+def _booster_arrays(xgb_model):
+    booster = xgb_model.get_booster()
+    model = json.loads(booster.save_raw(raw_format='json'))
+    learner = model['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise NotImplementedError(f'Objective {objective} belum didukung oleh compiled_model')
+    gbm = learner['gradient_booster']
+    if gbm['name'] != 'gbtree':
+        raise NotImplementedError(f"Booster {gbm['name']} belum didukung oleh compiled_model")
+
+    trees = gbm['model']['trees']
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is not None:
+        # Sama seperti XGBClassifier.predict: hanya pohon sampai best_iteration
+        indptr = gbm['model'].get('iteration_indptr')
+        n_trees = indptr[int(best_iteration) + 1] if indptr else (int(best_iteration) + 1) * int(gbm['model']['gbtree_model_param']['num_parallel_tree'])
+        trees = trees[:n_trees]
+
+    feature, threshold, left, right, missing, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    for tree in trees:
+        if any(tree.get('split_type', [])):
+            raise NotImplementedError('Split kategorikal XGBoost belum didukung oleh compiled_model')
+        offset = len(feature)
+        roots.append(offset)
+        lc, rc = tree['left_children'], tree['right_children']
+        depth = [0] * len(lc)
+        for node in range(len(lc)):
+            conditions = tree['split_conditions'][node]
+            if lc[node] == -1:
+                # Daun: ketiga cabang menunjuk ke dirinya sendiri
+                feature.append(0)
+                threshold.append(0.0)
+                left.append(offset + node)
+                right.append(offset + node)
+                missing.append(offset + node)
+                value.append(conditions)
+            else:
+                feature.append(tree['split_indices'][node])
+                threshold.append(conditions)
+                left.append(offset + lc[node])
+                right.append(offset + rc[node])
+                missing.append(offset + (lc[node] if tree['default_left'][node] else rc[node]))
+                value.append(0.0)
+                depth[lc[node]] = depth[rc[node]] = depth[node] + 1
+        max_depth = max(max_depth, max(depth))
+
+    base_score = float(learner['learner_model_param']['base_score'])
+    return {
+        'feature': np.asarray(feature, dtype=np.int32),
+        'threshold': np.asarray(threshold, dtype=np.float32),
+        'left': np.asarray(left, dtype=np.int32),
+        'right': np.asarray(right, dtype=np.int32),
+        'missing': np.asarray(missing, dtype=np.int32),
+        'value': np.asarray(value, dtype=np.float32),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'max_depth': max_depth,
+        'base_margin': float(np.log(base_score / (1 - base_score)))
+    }
+
+
+def export_pipeline(pipeline, source_sha256=None):
+    """Ubah pipeline (add_custom_features + ColumnTransformer + XGBClassifier) menjadi CompiledModel."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+
+    steps = list(pipeline.steps) if isinstance(pipeline, Pipeline) else [(None, pipeline)]
+    derived = False
+    slots = None
+    sparse = False
+    for _, step in steps[:-1]:
+        if isinstance(step, FunctionTransformer):
+            name = getattr(step.func, '__name__', None)
+            if step.func is None:
+                continue
+            if name != 'add_custom_features':
+                raise NotImplementedError(f'FunctionTransformer({name}) belum didukung oleh compiled_model')
+            derived = True
+        elif isinstance(step, ColumnTransformer) and slots is None:
+            slots = _column_transformer_slots(step)
+            sparse = bool(getattr(step, 'sparse_output_', False))
+        else:
+            raise NotImplementedError(f'Langkah pipeline {type(step).__name__} belum didukung oleh compiled_model')
+    if slots is None:
+        raise NotImplementedError('Pipeline tanpa ColumnTransformer belum didukung oleh compiled_model')
+
+    trees = _booster_arrays(steps[-1][1])
+    # Output sparse dari ColumnTransformer tidak menyimpan nilai 0, dan XGBoost
+    # memperlakukan entri yang tidak tersimpan sebagai missing
+    trees['zero_as_missing'] = sparse
+    return CompiledModel(slots, derived, trees, source_sha256)
+
+
+# Model terkompilasi
+
+class CompiledModel:
+    """Pipeline prediksi tanpa sklearn/XGBoost: encoder sebagai daftar slot dan pohon sebagai array.
+
+    Menerima dict satu sesi, list of dict, array NumPy dengan urutan FEATURE_COLUMNS,
+    atau DataFrame. Probabilitas dihitung dalam float64 dari daun float32 yang sama
+    dengan XGBoost, sehingga bisa berbeda di digit ke-7; kelas prediksi identik.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, slots, derived, trees, source_sha256=None):
+        self.slots = slots
+        self.derived = derived
+        self.trees = trees
+        self.source_sha256 = source_sha256
+        for slot in slots:
+            if 'codes' in slot:
+                slot['code_map'] = {category: code for category, code in slot['codes']}
+        # Indeks disimpan sebagai int32, tapi fancy indexing NumPy paling cepat dengan intp.
+        # Array runtime yang sudah jadi (dari runtime_arrays, misalnya di shared memory) dipakai langsung.
+        self._feature = trees['feature'].astype(np.intp, copy=False)
+        self._threshold = trees['threshold']
+        if 'children' in trees:
+            self._children = trees['children']
+            self._default_right = trees['default_right']
+        else:
+            # Anak kiri/kanan node i ada di posisi 2i dan 2i+1
+            self._children = np.column_stack([trees['left'], trees['right']]).ravel().astype(np.intp)
+            self._default_right = trees['missing'] == trees['right']
+        self._value = trees['value']
+        self._roots = trees['roots'].astype(np.intp, copy=False)
+
+    @property
+    def n_features(self):
+        return len(self.slots)
+
+    # Transformasi fitur
+
+    def _columns(self, rows):
+        if isinstance(rows, dict):
+            columns = {col: np.asarray([value]) for col, value in rows.items()}
+        elif isinstance(rows, np.ndarray):
+            rows = rows.reshape(1, -1) if rows.ndim == 1 else rows
+            columns = {col: rows[:, i] for i, col in enumerate(FEATURE_COLUMNS)}
+        elif hasattr(rows, 'columns'):
+            columns = {col: rows[col].to_numpy() for col in rows.columns}
+        else:
+            columns = {col: np.asarray([row[col] for row in rows]) for col in FEATURE_COLUMNS}
+        if self.derived:
+            # Semua fitur turunan ditulis ke satu blok (fitur x baris); transform
+            # tetap mengubah setiap kolom ke float64
+            n = len(next(iter(columns.values())))
+            block = derived_features(columns, out=np.empty((len(DERIVED_FEATURES), n)))
+            columns.update(zip(DERIVED_FEATURES, block))
+        return columns
+
+    def transform(self, rows):
+        columns = self._columns(rows)
+        n = len(next(iter(columns.values())))
+        X = np.empty((n, len(self.slots)), dtype=np.float64)
+        for j, slot in enumerate(self.slots):
+            v = columns[slot['col']]
+            if 'eq' in slot:
+                X[:, j] = v == slot['eq']
+                continue
+            if 'codes' in slot:
+                code_map, unknown = slot['code_map'], slot['unknown']
+                v = np.array([code_map.get(_py(x), unknown) for x in v], dtype=np.float64)
+            else:
+                v = v.astype(np.float64)
+            for op, arg in slot['ops']:
+                if op == 'sub':
+                    v = v - arg
+                elif op == 'div':
+                    v = v / arg
+                elif op == 'mul':
+                    v = v * arg
+                elif op == 'add':
+                    v = v + arg
+                elif op == 'fill':
+                    v = np.where(np.isnan(v), arg, v)
+            X[:, j] = v
+        # XGBoost membandingkan fitur sebagai float32
+        X = X.astype(np.float32)
+        if self.trees['zero_as_missing']:
+            X[X == 0] = np.nan
+        return X
+
+    def transform_one(self, record):
+        """Jalur cepat untuk satu sesi (dict), tanpa membuat array per kolom."""
+        if self.derived:
+            record = {**record, **derived_features(record)}
+        x = np.empty(len(self.slots), dtype=np.float64)
+        for j, slot in enumerate(self.slots):
+            v = record[slot['col']]
+            if 'eq' in slot:
+                x[j] = v == slot['eq']
+                continue
+            if 'codes' in slot:
+                v = slot['code_map'].get(v, slot['unknown'])
+            v = float(v)
+            for op, arg in slot['ops']:
+                if op == 'sub':
+                    v = v - arg
+                elif op == 'div':
+                    v = v / arg
+                elif op == 'mul':
+                    v = v * arg
+                elif op == 'add':
+                    v = v + arg
+                elif op == 'fill' and v != v:
+                    v = arg
+            x[j] = v
+        x = x.astype(np.float32)
+        if self.trees['zero_as_missing']:
+            x[x == 0] = np.nan
+        return x
+
+    # Prediksi
+
+    def decision_function(self, X):
+        # Semua pohon ditelusuri bersamaan, satu langkah per level kedalaman.
+        # Daun menunjuk ke dirinya sendiri sehingga tetap di tempat setelah tercapai.
+        nan_mask = np.isnan(X)
+        has_nan = nan_mask.any()
+        if X.ndim == 1:
+            node = self._roots
+            take, take_nan = X.take, nan_mask.take
+        else:
+            node = np.broadcast_to(self._roots, (len(X), len(self._roots)))
+            rows = np.arange(len(X))[:, None]
+            take = lambda features: X[rows, features]
+            take_nan = lambda features: nan_mask[rows, features]
+        for _ in range(self.trees['max_depth']):
+            features = self._feature[node]
+            go_right = take(features) >= self._threshold[node]
+            if has_nan:
+                go_right |= take_nan(features) & self._default_right[node]
+            node = self._children[2 * node + go_right]
+        return self.trees['base_margin'] + self._value[node].sum(axis=-1, dtype=np.float64)
+
+    def _proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict_proba(self, rows):
+        return self._proba(self.transform(rows))
+
+    def predict(self, rows):
+        return (self.predict_proba(rows)[:, 1] > 0.5).astype(np.int64)
+
+    def predict_one(self, record):
+        """Kelas dan probabilitas membeli untuk satu sesi (dict)."""
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(self.transform_one(record))))
+        return int(p > 0.5), float(p)
+
+    # Simpan/muat
+
+    def meta(self):
+        return {'slots': [{k: v for k, v in slot.items() if k != 'code_map'} for slot in self.slots],
+                'derived': self.derived, 'source_sha256': self.source_sha256,
+                'max_depth': self.trees['max_depth'], 'base_margin': self.trees['base_margin'],
+                'zero_as_missing': self.trees['zero_as_missing']}
+
+    def arrays(self):
+        return {k: v for k, v in self.trees.items() if isinstance(v, np.ndarray) and k not in ('children', 'default_right')}
+
+    def runtime_arrays(self):
+        """Array yang dipakai saat prediksi, dalam bentuk akhirnya (tanpa konversi saat dimuat)."""
+        return {'feature': self._feature, 'threshold': self._threshold, 'children': self._children,
+                'default_right': self._default_right, 'value': self._value, 'roots': self._roots}
+
+    @classmethod
+    def from_arrays(cls, meta, arrays):
+        trees = dict(arrays)
+        trees['max_depth'] = meta['max_depth']
+        trees['base_margin'] = meta['base_margin']
+        trees['zero_as_missing'] = meta['zero_as_missing']
+        return cls(meta['slots'], meta['derived'], trees, meta['source_sha256'])
+
+    def save(self, path=COMPILED_PATH):
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, meta=np.array(json.dumps(self.meta())), **self.arrays())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            arrays = {k: data[k] for k in data.files if k != 'meta'}
+        return cls.from_arrays(meta, arrays)
+
+
+_loaded = {}
+
+
+def get_compiled_model(model_sha256, path=COMPILED_PATH):
+    """Model terkompilasi untuk pickle dengan hash `model_sha256`, atau None jika belum diekspor."""
+    from shared_store import shared_model
+    shared = shared_model()
+    if shared is not None and shared.source_sha256 == model_sha256:
+        return shared
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, CompiledModel.load(path))
+        _loaded[path] = cached
+    compiled = cached[1]
+    return compiled if compiled.source_sha256 == model_sha256 else None
+
+
+def verify_parity(pipeline, compiled, df):
+    """Bandingkan prediksi pipeline asli dengan model terkompilasi pada `df`."""
+    X = df[FEATURE_COLUMNS]
+    expected_proba = pipeline.predict_proba(X)[:, 1]
+    expected = pipeline.predict(X)
+    proba = compiled.predict_proba(X)[:, 1]
+    single = np.array([compiled.predict_one(record)[1] for record in X.head(1000).to_dict('records')])
+    return {
+        'rows': len(X),
+        'label_mismatch': int((compiled.predict(X) != np.asarray(expected).astype(np.int64)).sum()),
+        'max_abs_proba_diff': float(np.abs(proba - expected_proba).max()),
+        'max_abs_proba_diff_single': float(np.abs(single - expected_proba[:len(single)]).max())
+    }
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Ekspor model pickle ke model terkompilasi untuk inferensi cepat')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output', default=COMPILED_PATH)
+    parser.add_argument('--verify', default=None, metavar='CSV', help='Cek paritas prediksi pada dataset CSV ini')
+    args = parser.parse_args(argv)
+
+    pipeline = ModelRegistry(args.model).get()
+    compiled = export_pipeline(pipeline, file_sha256(args.model))
+
+    if args.verify:
+        df = pd.read_csv(args.verify)
+        result = verify_parity(pipeline, compiled, df)
+        print(f"Paritas pada {result['rows']} baris: {result['label_mismatch']} kelas berbeda, "
+              f"selisih probabilitas maks {result['max_abs_proba_diff']:.2e}")
+        if result['label_mismatch']:
+            # Jangan tinggalkan hasil ekspor lama untuk pickle yang sama, halaman
+            # Prediksi harus kembali ke pickle
+            if os.path.exists(args.output) and CompiledModel.load(args.output).source_sha256 == compiled.source_sha256:
+                os.remove(args.output)
+            raise SystemExit(f'Model terkompilasi tidak sama dengan pickle, {args.output} tidak ditulis')
+
+        record = df[FEATURE_COLUMNS].iloc[0].to_dict()
+        row = df[FEATURE_COLUMNS].head(1)
+        for label, func in [('pickle', lambda: pipeline.predict(row)), ('compiled', lambda: compiled.predict_one(record))]:
+            n = 200
+            start = time.perf_counter()
+            for _ in range(n):
+                func()
+            print(f'Latensi satu baris ({label}): {(time.perf_counter() - start) / n * 1e6:.0f} µs')
+
+    compiled.save(args.output)
+    print(f'{len(compiled.trees["roots"])} pohon dan {compiled.n_features} fitur diekspor ke {args.output}')
+
+if __name__ == '__main__':
+    main()
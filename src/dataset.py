@@ -0,0 +1,142 @@
+import argparse
+import logging
+import os
+import time
+
+import pandas as pd
+
+CSV_PATH = 'src/ecommerce_purchasing_intention.csv'
+ARROW_PATH = 'src/ecommerce_purchasing_intention.arrow'
+DEFAULT_CHUNKSIZE = 1 << 20
+
+# Tipe kolom pada file kolumnar. Kolom kategori teks disimpan sebagai kode
+# dictionary, boolean disimpan sebagai bit oleh Arrow.
+INT_COLUMNS = ['Administrative', 'Informational', 'ProductRelated']
+FLOAT_COLUMNS = [
+    'Administrative_Duration', 'Informational_Duration', 'ProductRelated_Duration',
+    'BounceRates', 'ExitRates', 'PageValues', 'SpecialDay'
+]
+CODE_COLUMNS = ['OperatingSystems', 'Browser', 'Region', 'TrafficType']
+DICTIONARY_COLUMNS = ['Month', 'VisitorType']
+BOOL_COLUMNS = ['Weekend', 'Revenue']
+
+logger = logging.getLogger(__name__)
+
+
+def _column_types():
+    import pyarrow as pa
+    types = {}
+    types.update({col: pa.int32() for col in INT_COLUMNS})
+    types.update({col: pa.float64() for col in FLOAT_COLUMNS})
+    types.update({col: pa.int16() for col in CODE_COLUMNS})
+    types.update({col: pa.dictionary(pa.int32(), pa.string()) for col in DICTIONARY_COLUMNS})
+    types.update({col: pa.bool_() for col in BOOL_COLUMNS})
+    return types
+
+
+def convert(csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """Tulis dataset CSV ke file Arrow IPC (tanpa kompresi) yang bisa di-memory-map."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(
+        csv_path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types=_column_types(),
+            true_values=['True', 'TRUE', 'true'],
+            false_values=['False', 'FALSE', 'false']
+        )
+    )
+    # Satu dictionary untuk seluruh record batch, syarat format file IPC
+    table = table.unify_dictionaries().combine_chunks()
+    # Pembaca CSV Arrow hanya membuat indeks int32, kecilkan ke int8 jika muat
+    for col in DICTIONARY_COLUMNS:
+        i = table.schema.get_field_index(col)
+        column = table.column(i)
+        if column.num_chunks and len(column.chunk(0).dictionary) <= 127:
+            table = table.set_column(i, col, column.cast(pa.dictionary(pa.int8(), pa.string())))
+
+    tmp_path = arrow_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=1 << 20)
+    os.replace(tmp_path, arrow_path)
+    return table.num_rows
+
+
+def arrow_is_fresh(csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    if not os.path.exists(arrow_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.stat(arrow_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+
+
+def resolve_path(csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """Path file yang akan dibaca: file Arrow jika ada dan tidak lebih lama dari CSV."""
+    return arrow_path if arrow_is_fresh(csv_path, arrow_path) else csv_path
+
+
+def open_table(arrow_path=ARROW_PATH):
+    import pyarrow as pa
+    # Memory map: data kolom tidak disalin ke heap sampai benar-benar dibaca
+    source = pa.memory_map(arrow_path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_dataset(columns=None, csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """Muat dataset sebagai DataFrame, hanya kolom `columns` jika diberikan.
+
+    Membaca file Arrow yang di-memory-map jika tersedia, dan kembali ke
+    pd.read_csv jika file Arrow belum dibuat atau lebih lama dari CSV.
+    """
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+    # Mode multi-proses (serve_pool.py): kolom dibaca dari shared memory tanpa salinan
+    from shared_store import shared_dataset
+    shared = shared_dataset(columns, resolve_path(csv_path, arrow_path))
+    if shared is not None:
+        return shared
+    if arrow_is_fresh(csv_path, arrow_path):
+        table = open_table(arrow_path)
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas(split_blocks=True)
+
+    if os.path.exists(arrow_path):
+        logger.warning('%s lebih lama dari %s, membaca CSV', arrow_path, csv_path)
+    return pd.read_csv(csv_path, usecols=columns)
+
+
+def iter_dataset(columns=None, chunksize=DEFAULT_CHUNKSIZE, csv_path=CSV_PATH, arrow_path=ARROW_PATH):
+    """Baca dataset per chunk DataFrame sehingga memori tetap terbatas.
+
+    Record batch dari file Arrow yang di-memory-map hanya disalin ke heap satu
+    per satu; tanpa file Arrow, CSV dibaca dengan pd.read_csv(chunksize=...).
+    """
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+    if arrow_is_fresh(csv_path, arrow_path):
+        table = open_table(arrow_path)
+        if columns is not None:
+            table = table.select(columns)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(csv_path, usecols=columns, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Konversi dataset CSV ke format kolumnar Arrow')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--output', default=ARROW_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = convert(args.csv, args.output)
+    print(f'{rows} baris ditulis ke {args.output} dalam {time.perf_counter() - start:.2f} detik '
+          f'({os.path.getsize(args.output) / 1e6:.1f} MB, CSV {os.path.getsize(args.csv) / 1e6:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
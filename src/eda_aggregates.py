@@ -0,0 +1,419 @@
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from dataset import CSV_PATH
+
+AGGREGATE_PATH = 'src/eda_aggregates.pkl'
+
+NUM_FEATURES = [
+    "Administrative", "Administrative_Duration", "Informational",
+    "Informational_Duration", "ProductRelated", "ProductRelated_Duration",
+    "BounceRates", "ExitRates", "PageValues", "SpecialDay"
+]
+CAT_FEATURES = ['Month', 'OperatingSystems', 'Browser', 'Region', 'TrafficType', 'VisitorType', 'Weekend']
+MONTH_ORDER = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'June', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+VISITOR_TYPES = ['New_Visitor', 'Other', 'Returning_Visitor']
+
+# Tabel kontingensi (kelompok x Revenue) yang disimpan di store
+COUNT_GROUPS = [(col,) for col in CAT_FEATURES] + [('Month', 'Weekend'), ('VisitorType', 'Month')]
+
+# Panjang awal file dan bagian terakhir yang sudah diproses (tepat sebelum
+# offset) yang di-hash untuk mendeteksi file ditulis ulang (bukan di-append)
+PREFIX_BYTES = 1 << 16
+TAIL_BYTES = 1 << 16
+PARSE_CHUNKSIZE = 500_000
+# Data baru dibaca per blok sebesar ini supaya memori tetap terbatas
+READ_BYTES = 64 << 20
+
+logger = logging.getLogger(__name__)
+
+
+# Fungsi bantu Cramer's V
+def cramers_v(confusion_matrix, chi2=None):
+    if chi2 is None:
+        from scipy.stats import chi2_contingency
+        chi2 = chi2_contingency(confusion_matrix)[0]
+    n = confusion_matrix.sum().sum()
+    r, k = confusion_matrix.shape
+    return np.sqrt(chi2 / (n * (min(k - 1, r - 1))))
+
+
+def chunk_statistics(chunk):
+    """Statistik cukup satu chunk dalam satu lintasan.
+
+    Momen semua fitur numerik didapat dari satu perkalian matriks terhadap
+    Revenue. Setiap kolom kategori di-factorize sekali dan dipakai bersama oleh
+    semua tabel kontingensi yang memakainya, lalu dihitung dengan np.bincount.
+    """
+    x = chunk[NUM_FEATURES].to_numpy(dtype=float)
+    revenue = chunk['Revenue'].to_numpy(dtype=bool)
+    y = revenue.astype(float)
+    mean_x = x.mean(axis=0)
+    mean_y = y.mean()
+    dx = x - mean_x
+    dy = y - mean_y
+    stats = {
+        'rows': len(chunk),
+        'mean_x': mean_x,
+        'mean_y': mean_y,
+        'm2_x': np.einsum('ij,ij->j', dx, dx),
+        'm2_y': dy @ dy,
+        'c_xy': dy @ dx,
+        'counts': {}
+    }
+
+    codes = {}
+    for col in dict.fromkeys(col for group in COUNT_GROUPS for col in group):
+        col_codes, uniques = pd.factorize(chunk[col], sort=True)
+        codes[col] = (col_codes, np.asarray(uniques))
+
+    for group in COUNT_GROUPS:
+        key = np.zeros(len(chunk), dtype=np.intp)
+        valid = np.ones(len(chunk), dtype=bool)
+        for col in group:
+            col_codes, uniques = codes[col]
+            key = key * len(uniques) + col_codes
+            # Nilai kosong (kode -1) diabaikan, sama seperti pd.crosstab
+            valid &= col_codes >= 0
+        key = key * 2 + revenue
+        levels = [codes[col][1] for col in group] + [np.array([False, True])]
+        size = int(np.prod([len(level) for level in levels]))
+        counts = np.bincount(key[valid], minlength=size)
+        index = pd.MultiIndex.from_product(levels, names=list(group) + ['Revenue'])
+        series = pd.Series(counts, index=index)
+        stats['counts'][group] = series[series > 0]
+    return stats
+
+
+def _iter_line_blocks(f, length, block_size=READ_BYTES):
+    """Baca `length` byte dari posisi `f` saat ini per blok yang berakhir di batas baris.
+
+    Baris terakhir yang belum lengkap tidak dikembalikan, baris itu diproses
+    pada refresh berikutnya.
+    """
+    rest = b''
+    while length > 0:
+        block = f.read(min(block_size, length))
+        if not block:
+            break
+        length -= len(block)
+        block = rest + block
+        end = block.rfind(b'\n') + 1
+        rest = block[end:]
+        if end:
+            yield block[:end]
+
+
+def _split_lines(data, pieces):
+    """Bagi `data` menjadi paling banyak `pieces` potongan di batas baris."""
+    step = max(1, len(data) // pieces)
+    result = []
+    start = 0
+    while start < len(data):
+        end = data.find(b'\n', min(start + step, len(data) - 1)) + 1 or len(data)
+        result.append(data[start:end])
+        start = end
+    return result
+
+
+def _piece_statistics(data, columns):
+    return chunk_statistics(pd.read_csv(BytesIO(data), header=None, names=columns))
+
+
+class AggregateStore:
+    """Statistik cukup (sufficient statistics) EDA yang diperbarui per baris baru.
+
+    Untuk korelasi point-biserial disimpan n, rata-rata, jumlah kuadrat deviasi
+    dan co-moment terhadap Revenue (digabung dengan rumus Chan dkk. supaya stabil
+    secara numerik). Untuk uji Chi-Squared dan tabel konversi disimpan jumlah
+    baris per kombinasi kategori x Revenue. `refresh()` hanya mem-parsing byte
+    CSV setelah offset terakhir yang sudah diproses.
+    """
+
+    def __init__(self, csv_path=CSV_PATH):
+        self.csv_path = csv_path
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.columns = None
+        self.offset = 0
+        self.prefix_sha256 = None
+        self.tail_sha256 = None
+        self.rows = 0
+        self.mean_x = np.zeros(len(NUM_FEATURES))
+        self.m2_x = np.zeros(len(NUM_FEATURES))
+        self.c_xy = np.zeros(len(NUM_FEATURES))
+        self.mean_y = 0.0
+        self.m2_y = 0.0
+        self.counts = {}
+
+    @property
+    def token(self):
+        # Berubah setiap kali ada baris baru, dipakai sebagai kunci cache tabel/grafik
+        return f'agg:{self.prefix_sha256}:{self.rows}'
+
+    def _prefix_hash(self, f, length):
+        f.seek(0)
+        return hashlib.sha256(f.read(min(length, PREFIX_BYTES))).hexdigest()
+
+    def _tail_hash(self, f, length):
+        start = max(0, length - TAIL_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(length - start)).hexdigest()
+
+    def refresh(self, workers=0):
+        """Proses baris yang ditambahkan sejak refresh terakhir, kembalikan jumlahnya.
+
+        Dengan `workers` > 1 potongan-potongan data baru di-parse dan diagregasi
+        paralel di process pool, lalu statistik parsialnya digabung berurutan.
+        """
+        with self.lock:
+            with open(self.csv_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if (self.columns is None or size < self.offset
+                        or self._prefix_hash(f, self.offset) != self.prefix_sha256
+                        or self._tail_hash(f, self.offset) != self.tail_sha256):
+                    # File baru atau ditulis ulang: hitung dari awal
+                    self._reset()
+                    f.seek(0)
+                    header = f.readline()
+                    self.columns = header.decode().strip().split(',')
+                    self.offset = len(header)
+
+                f.seek(self.offset)
+                added = 0
+                pool = None
+                if workers and workers > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+                    pool = ProcessPoolExecutor(workers)
+                try:
+                    for data in _iter_line_blocks(f, size - self.offset):
+                        if pool is not None:
+                            pieces = _split_lines(data, workers * 4)
+                            for stats in pool.map(_piece_statistics, pieces, [self.columns] * len(pieces)):
+                                if stats['rows']:
+                                    self.merge(stats)
+                                    added += stats['rows']
+                        else:
+                            for chunk in pd.read_csv(BytesIO(data), header=None, names=self.columns,
+                                                     chunksize=PARSE_CHUNKSIZE):
+                                self.add_chunk(chunk)
+                                added += len(chunk)
+                        self.offset += len(data)
+                finally:
+                    if pool is not None:
+                        pool.shutdown()
+                self.prefix_sha256 = self._prefix_hash(f, self.offset)
+                self.tail_sha256 = self._tail_hash(f, self.offset)
+            return added
+
+    def add_chunk(self, chunk):
+        if len(chunk):
+            self.merge(chunk_statistics(chunk))
+
+    def merge(self, stats):
+        """Gabungkan statistik parsial (dari chunk_statistics) ke store."""
+        with self.lock:
+            n_a, n_b = self.rows, stats['rows']
+            n = n_a + n_b
+            delta_x = stats['mean_x'] - self.mean_x
+            delta_y = stats['mean_y'] - self.mean_y
+            factor = n_a * n_b / n
+            self.mean_x = self.mean_x + delta_x * n_b / n
+            self.mean_y = self.mean_y + delta_y * n_b / n
+            self.m2_x = self.m2_x + stats['m2_x'] + delta_x * delta_x * factor
+            self.m2_y = self.m2_y + stats['m2_y'] + delta_y * delta_y * factor
+            self.c_xy = self.c_xy + stats['c_xy'] + delta_x * delta_y * factor
+            self.rows = n
+
+            for group, counts in stats['counts'].items():
+                old = self.counts.get(group)
+                self.counts[group] = counts if old is None else old.add(counts, fill_value=0).astype('int64')
+
+    def crosstab(self, *group):
+        """Tabel kontingensi `group` x Revenue, setara dengan pd.crosstab."""
+        with self.lock:
+            table = self.counts[tuple(group)].unstack('Revenue', fill_value=0)
+        return table.reindex(columns=[False, True], fill_value=0).rename_axis(columns='Revenue')
+
+    def save(self, path=AGGREGATE_PATH):
+        with self.lock:
+            state = {k: v for k, v in self.__dict__.items() if k != 'lock'}
+        # File sementara unik di direktori yang sama: beberapa proses (worker
+        # Streamlit di serve_pool.py) bisa menyimpan bersamaan, os.replace atomik
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path=AGGREGATE_PATH, csv_path=CSV_PATH):
+        store = cls(csv_path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+            except Exception:
+                # File rusak: mulai dari store kosong, refresh membangun ulang dari CSV
+                logger.exception('Gagal membaca %s, agregat dibangun ulang', path)
+                return store
+            if isinstance(state, dict) and state.get('csv_path') == csv_path:
+                store.__dict__.update(state)
+        return store
+
+
+# Tabel hasil EDA yang dibaca dari store
+def point_biserial_table(store):
+    from scipy.stats import t
+
+    with store.lock:
+        n = store.rows
+        r = store.c_xy / np.sqrt(store.m2_x * store.m2_y)
+    r = np.clip(r, -1.0, 1.0)
+    with np.errstate(divide='ignore'):
+        t_stat = r * np.sqrt((n - 2) / (1.0 - r * r))
+    p = 2 * t.sf(np.abs(t_stat), n - 2)
+
+    point_biserial = pd.DataFrame({'Fitur': NUM_FEATURES, 'P-value': p, 'Tingkat signifikasi': r})
+    return point_biserial.sort_values(by='Tingkat signifikasi', key=abs, ascending=False)
+
+
+def chi2_tests(store, features=CAT_FEATURES):
+    """Uji Chi-Squared semua fitur sekaligus, setara chi2_contingency per tabel.
+
+    Sel semua tabel kontingensi digabung menjadi satu array sehingga nilai
+    harapan dan statistik chi2 dihitung dalam satu lintasan vektor. Koreksi
+    Yates diterapkan pada tabel dengan dof 1, seperti default scipy.
+    """
+    from scipy.stats import chi2 as chi2_dist
+
+    tables = []
+    for col in features:
+        contingency = store.crosstab(col)
+        tables.append(contingency.loc[:, contingency.sum() > 0])
+
+    sizes = np.array([table.size for table in tables])
+    observed = np.concatenate([table.to_numpy(dtype=float).ravel() for table in tables])
+    row_totals = np.concatenate([np.repeat(table.sum(axis=1).to_numpy(), table.shape[1]) for table in tables])
+    col_totals = np.concatenate([np.tile(table.sum(axis=0).to_numpy(), table.shape[0]) for table in tables])
+    n = np.repeat([table.to_numpy().sum() for table in tables], sizes)
+    dof = np.array([(table.shape[0] - 1) * (table.shape[1] - 1) for table in tables])
+
+    expected = row_totals * col_totals / n
+    diff = expected - observed
+    yates = np.repeat(dof == 1, sizes)
+    observed = np.where(yates, observed + np.minimum(0.5, np.abs(diff)) * np.sign(diff), observed)
+    feature_id = np.repeat(np.arange(len(tables)), sizes)
+    chi2 = np.bincount(feature_id, weights=(observed - expected) ** 2 / expected, minlength=len(tables))
+
+    chi2 = np.where(dof == 0, 0.0, chi2)
+    p = np.where(dof == 0, 1.0, chi2_dist.sf(chi2, np.maximum(dof, 1)))
+    return tables, chi2, p, dof
+
+
+def cramers_v_table(store):
+    tables, chi2, p, _ = chi2_tests(store)
+    hasil = []
+    for col, contingency, chi2_col, p_col in zip(CAT_FEATURES, tables, chi2, p):
+        # chi2 dipakai ulang, tabel kontingensi tidak dihitung dua kali
+        hasil.append({'Fitur': col, 'P-value': p_col, "Cramer's V": cramers_v(contingency, chi2_col)})
+
+    chi_square_df = pd.DataFrame(hasil)
+    return chi_square_df.sort_values(by="Cramer's V", ascending=False)
+
+
+def _conversion_rate(contingency):
+    return contingency[True].div(contingency.sum(axis=1)).mul(100)
+
+
+def month_conversion_table(store):
+    contingency = store.crosstab('Month')
+    beli = contingency[contingency[True] > 0]
+    return pd.DataFrame({'Month': beli.index, 'Revenue': True, 'Percentage': _conversion_rate(beli).to_numpy()})
+
+
+def month_weekend_pivot(store):
+    pivot = _conversion_rate(store.crosstab('Month', 'Weekend')).unstack('Weekend')
+    return pivot.reindex(['Jul', 'Aug', 'Sep', 'Oct', 'Nov'])
+
+
+def visitor_type_shares(store):
+    contingency = store.crosstab('VisitorType')
+    shares = {}
+    for vtype in VISITOR_TYPES:
+        if vtype in contingency.index:
+            row = contingency.loc[vtype]
+            shares[vtype] = [row[False] / row.sum() * 100, row[True] / row.sum() * 100]
+        else:
+            shares[vtype] = [0, 0]
+    return shares
+
+
+def new_visitor_month_table(store):
+    contingency = store.crosstab('VisitorType', 'Month')
+    new_visitor = contingency.xs('New_Visitor', level='VisitorType')
+    new_visitor_month = _conversion_rate(new_visitor).rename('Persentase_Pembelian').reset_index()
+    new_visitor_month['Month'] = pd.Categorical(new_visitor_month['Month'], categories=MONTH_ORDER, ordered=True)
+    return new_visitor_month.sort_values('Month')
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AggregateStore.load()
+    return _store
+
+
+def refresh_store(store=None, path=AGGREGATE_PATH, workers=None):
+    store = store or get_store()
+    if workers is None:
+        workers = int(os.environ.get('EDA_AGGREGATE_WORKERS', 0))
+    start = time.perf_counter()
+    added = store.refresh(workers)
+    if added:
+        store.save(path)
+        logger.info('%d baris baru ditambahkan ke agregat EDA dalam %.1f ms (total %d)',
+                    added, (time.perf_counter() - start) * 1000, store.rows)
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Perbarui agregat EDA dengan baris baru di dataset CSV')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--output', default=AGGREGATE_PATH)
+    parser.add_argument('--workers', type=int, default=0, help='Jumlah proses untuk agregasi paralel')
+    args = parser.parse_args(argv)
+
+    store = AggregateStore.load(args.output, args.csv)
+    start = time.perf_counter()
+    added = refresh_store(store, args.output, args.workers)
+    print(f'{added} baris baru diproses dalam {time.perf_counter() - start:.2f} detik (total {store.rows} baris)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+import dataset
+from features import dominant_section, engagement_features
+
+# Akurasi relatif kuantil dari sketch (0.01 = estimasi dalam 1% dari nilai sebenarnya)
+SKETCH_ACCURACY = float(os.environ.get('EDA_SKETCH_ACCURACY', 0.01))
+# Dataset lebih besar dari ini diproses per chunk (out-of-core) di halaman EDA
+IN_MEMORY_MAX_MB = float(os.environ.get('EDA_IN_MEMORY_MAX_MB', 512))
+HIST_BINS = 50
+# Jumlah maksimum outlier per kotak yang digambar (sampel acak seragam)
+MAX_FLIERS = 2000
+
+COLUMNS = ['Administrative', 'Administrative_Duration', 'Informational', 'Informational_Duration',
+           'ProductRelated', 'ProductRelated_Duration', 'PageValues', 'Revenue']
+
+
+def should_stream(path):
+    return os.path.getsize(path) > IN_MEMORY_MAX_MB * 1024 * 1024
+
+
+class QuantileSketch:
+    """Sketch kuantil dengan akurasi relatif yang bisa diatur (gaya DDSketch).
+
+    Nilai dikelompokkan ke bucket logaritmik dengan rasio gamma antar batas
+    bucket, sehingga setiap order statistic diestimasi dalam
+    `relative_accuracy` dari nilai sebenarnya; kuantil diinterpolasi di antara
+    dua order statistic seperti Series.quantile. Memori sebanding dengan log(max/min), bukan jumlah baris,
+    dan dua sketch bisa digabung dengan menjumlahkan bucket.
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _add_buckets(self, buckets, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._add_buckets(self.positive, values[values > 0])
+        self._add_buckets(self.negative, -values[values < 0])
+        self.zero += int(np.count_nonzero(values == 0))
+
+    def merge(self, other):
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _order_statistic(self, k):
+        # Estimasi nilai ke-k (0-based) setelah diurutkan, dalam relative_accuracy
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > k:
+                return float(np.clip(-self._bucket_value(key), self.min, self.max))
+        seen += self.zero
+        if seen > k:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > k:
+                return float(np.clip(self._bucket_value(key), self.min, self.max))
+        return self.max
+
+    def quantile(self, q):
+        """Estimasi kuantil `q` dengan interpolasi linear seperti Series.quantile.
+
+        Dua order statistic di sekitar rank q * (n - 1) masing-masing diestimasi
+        dalam `relative_accuracy`, lalu diinterpolasi. Untuk nilai bertanda sama
+        hasilnya tetap dalam `relative_accuracy` dari kuantil pandas.
+        """
+        if not self.count:
+            return np.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        lower = int(np.floor(rank))
+        fraction = rank - lower
+        value = self._order_statistic(lower)
+        if fraction:
+            value += fraction * (self._order_statistic(lower + 1) - value)
+        return value
+
+
+class _BoxAccumulator:
+    """Ringkasan boxplot satu kelompok: kuartil dari sketch, whisker dan outlier exact.
+
+    Lintasan pertama mengisi sketch, lintasan kedua (setelah kuartil diketahui)
+    mencari whisker dan mengambil sampel outlier dengan prioritas acak
+    (bottom-k) sehingga jumlahnya tidak bergantung pada ukuran data.
+    """
+
+    def __init__(self, relative_accuracy, max_fliers, rng):
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.max_fliers = max_fliers
+        self.rng = rng
+        self.total = 0.0
+        self.whislo = np.inf
+        self.whishi = -np.inf
+        self.fliers = np.empty(0)
+        self.priority = np.empty(0)
+
+    def add(self, values):
+        self.sketch.add(values)
+        self.total += float(values.sum())
+
+    def bounds(self):
+        self.q1, self.med, self.q3 = (self.sketch.quantile(q) for q in (0.25, 0.5, 0.75))
+        iqr = self.q3 - self.q1
+        self.low, self.high = self.q1 - 1.5 * iqr, self.q3 + 1.5 * iqr
+
+    def add_outer(self, values):
+        inside = values[(values >= self.low) & (values <= self.high)]
+        if len(inside):
+            self.whislo = min(self.whislo, inside.min())
+            self.whishi = max(self.whishi, inside.max())
+        outside = values[(values < self.low) | (values > self.high)]
+        if len(outside):
+            self.fliers = np.concatenate([self.fliers, outside])
+            self.priority = np.concatenate([self.priority, self.rng.random(len(outside))])
+            if len(self.fliers) > self.max_fliers:
+                keep = np.argpartition(self.priority, self.max_fliers)[:self.max_fliers]
+                self.fliers, self.priority = self.fliers[keep], self.priority[keep]
+
+    def stats(self, label):
+        whislo = self.whislo if np.isfinite(self.whislo) else self.q1
+        whishi = self.whishi if np.isfinite(self.whishi) else self.q3
+        fliers = self.fliers
+        # Nilai ekstrem selalu ikut digambar supaya rentang sumbu tetap benar
+        for extreme in (self.sketch.min, self.sketch.max):
+            if (extreme < whislo or extreme > whishi) and extreme not in fliers:
+                fliers = np.append(fliers, extreme)
+        return {
+            'label': label, 'q1': self.q1, 'med': self.med, 'q3': self.q3,
+            'whislo': whislo, 'whishi': whishi, 'fliers': np.sort(fliers),
+            'mean': self.total / self.sketch.count
+        }
+
+
+def summarize(chunks=None, relative_accuracy=SKETCH_ACCURACY, max_fliers=MAX_FLIERS, seed=0):
+    """Ringkasan grafik data mentah EDA dalam dua lintasan chunk dengan memori terbatas.
+
+    `chunks` adalah fungsi tanpa argumen yang mengembalikan iterator DataFrame
+    baru (default: dataset.iter_dataset). Hasilnya dict dengan
+    'pagevalues_distribution' (histogram per Revenue dan batas sumbu dari
+    kuantil 0.99) dan 'dominant_section' (statistik boxplot per DominantSection).
+    """
+    if chunks is None:
+        def chunks():
+            return dataset.iter_dataset(COLUMNS)
+
+    rng = np.random.default_rng(seed)
+    pagevalues = QuantileSketch(relative_accuracy)
+    boxes = {}
+
+    def aktif(chunk):
+        chunk = chunk.loc[chunk['PageValues'] > 0]
+        return dominant_section(engagement_features(chunk)), chunk['PageValues'].to_numpy(dtype=float)
+
+    # Lintasan 1: rentang dan sketch kuantil
+    for chunk in chunks():
+        pagevalues.add(chunk['PageValues'].to_numpy(dtype=float))
+        sections, values = aktif(chunk)
+        # Urutan kemunculan pertama, sama seperti urutan kategori seaborn
+        for section in dict.fromkeys(sections):
+            if section not in boxes:
+                boxes[section] = _BoxAccumulator(relative_accuracy, max_fliers, rng)
+            boxes[section].add(values[sections == section])
+
+    low, high = pagevalues.min, pagevalues.max
+    if not low < high:
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, HIST_BINS + 1)
+    counts = {False: np.zeros(HIST_BINS, dtype=np.int64), True: np.zeros(HIST_BINS, dtype=np.int64)}
+    for box in boxes.values():
+        box.bounds()
+
+    # Lintasan 2: histogram pada batas bin global, whisker dan outlier
+    for chunk in chunks():
+        values = chunk['PageValues'].to_numpy(dtype=float)
+        revenue = chunk['Revenue'].to_numpy(dtype=bool)
+        for label in counts:
+            counts[label] += np.histogram(values[revenue == label], edges)[0]
+        sections, values = aktif(chunk)
+        for section, box in boxes.items():
+            box.add_outer(values[sections == section])
+
+    return {
+        'pagevalues_distribution': {
+            'edges': edges, 'counts': counts, 'xlim': (0, pagevalues.quantile(0.99))
+        },
+        'dominant_section': [box.stats(section) for section, box in boxes.items()]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ringkasan EDA out-of-core dari dataset per chunk')
+    parser.add_argument('--accuracy', type=float, default=SKETCH_ACCURACY, help='Akurasi relatif sketch kuantil')
+    parser.add_argument('--chunksize', type=int, default=dataset.DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summary = summarize(lambda: dataset.iter_dataset(COLUMNS, args.chunksize), args.accuracy)
+    distribution = summary['pagevalues_distribution']
+    print(f'Selesai dalam {time.perf_counter() - start:.2f} detik')
+    print(f"PageValues kuantil 0.99 ~ {distribution['xlim'][1]:.4f}, "
+          f"baris per Revenue: { {k: int(v.sum()) for k, v in distribution['counts'].items()} }")
+    for stats in summary['dominant_section']:
+        print(f"{stats['label']:<15} q1={stats['q1']:.3f} median={stats['med']:.3f} q3={stats['q3']:.3f} "
+              f"whisker=[{stats['whislo']:.3f}, {stats['whishi']:.3f}] outlier={len(stats['fliers'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,28 @@
 import streamlit as st
 import pandas as pd
 
+# Skema dataset (juga dipakai benchmarks/run.py untuk membuat data sintetis)
+DATA_INFO = [
+    ["Administrative", "Numerik", "Jumlah halaman administratif yang dikunjungi pengunjung"],
+    ["Administrative_Duration", "Numerik", "Durasi waktu (detik) pada halaman administratif"],
+    ["Informational", "Numerik", "Jumlah halaman informasi yang dikunjungi pengunjung"],
+    ["Informational_Duration", "Numerik", "Durasi waktu (detik) pada halaman informasi"],
+    ["ProductRelated", "Numerik", "Jumlah halaman produk yang dikunjungi pengunjung"],
+    ["ProductRelated_Duration", "Numerik", "Durasi waktu (detik) pada halaman produk"],
+    ["BounceRates", "Numerik", "Rasio pengunjung keluar dari halaman setelah melihat satu halaman"],
+    ["ExitRates", "Numerik", "Rasio keluar dari halaman terakhir sebelum meninggalkan situs"],
+    ["PageValues", "Numerik", "Nilai halaman berdasarkan transaksi dan navigasi sebelumnya"],
+    ["SpecialDay", "Numerik", "Indikator kedekatan waktu kunjungan dengan hari spesial (misal: Valentine)"],
+    ["Month", "Kategorikal", "Bulan saat kunjungan terjadi"],
+    ["OperatingSystems", "Kategorikal", "Jenis sistem operasi pengunjung"],
+    ["Browser", "Kategorikal", "Jenis browser yang digunakan pengunjung"],
+    ["Region", "Kategorikal", "Wilayah geografis pengunjung"],
+    ["TrafficType", "Kategorikal", "Sumber traffic kunjungan"],
+    ["VisitorType", "Kategorikal", "Tipe pengunjung: baru, kembali, atau lain-lain"],
+    ["Weekend", "Boolean", "Apakah kunjungan terjadi saat akhir pekan"],
+    ["Revenue", "Boolean (Target)", "Apakah pengunjung melakukan pembelian"]
+]
+
 def run():
     st.title("🛍️ Project Data Science: Prediksi Pembelian Pengunjung Website")
     st.markdown("---")
@@ -44,26 +66,7 @@ def run():
     st.markdown("Dataset dapat diakses melalui link berikut:")
     st.markdown("[Online Shoppers Purchasing Intention Dataset - UCI Repository](https://archive.ics.uci.edu/ml/datasets/online+shoppers+purchasing+intention+dataset)")
 
-    data_info = pd.DataFrame([
-        ["Administrative", "Numerik", "Jumlah halaman administratif yang dikunjungi pengunjung"],
-        ["Administrative_Duration", "Numerik", "Durasi waktu (detik) pada halaman administratif"],
-        ["Informational", "Numerik", "Jumlah halaman informasi yang dikunjungi pengunjung"],
-        ["Informational_Duration", "Numerik", "Durasi waktu (detik) pada halaman informasi"],
-        ["ProductRelated", "Numerik", "Jumlah halaman produk yang dikunjungi pengunjung"],
-        ["ProductRelated_Duration", "Numerik", "Durasi waktu (detik) pada halaman produk"],
-        ["BounceRates", "Numerik", "Rasio pengunjung keluar dari halaman setelah melihat satu halaman"],
-        ["ExitRates", "Numerik", "Rasio keluar dari halaman terakhir sebelum meninggalkan situs"],
-        ["PageValues", "Numerik", "Nilai halaman berdasarkan transaksi dan navigasi sebelumnya"],
-        ["SpecialDay", "Numerik", "Indikator kedekatan waktu kunjungan dengan hari spesial (misal: Valentine)"],
-        ["Month", "Kategorikal", "Bulan saat kunjungan terjadi"],
-        ["OperatingSystems", "Kategorikal", "Jenis sistem operasi pengunjung"],
-        ["Browser", "Kategorikal", "Jenis browser yang digunakan pengunjung"],
-        ["Region", "Kategorikal", "Wilayah geografis pengunjung"],
-        ["TrafficType", "Kategorikal", "Sumber traffic kunjungan"],
-        ["VisitorType", "Kategorikal", "Tipe pengunjung: baru, kembali, atau lain-lain"],
-        ["Weekend", "Boolean", "Apakah kunjungan terjadi saat akhir pekan"],
-        ["Revenue", "Boolean (Target)", "Apakah pengunjung melakukan pembelian"]
-    ], columns=["Nama", "Tipe Data", "Deskripsi"])
+    data_info = pd.DataFrame(DATA_INFO, columns=["Nama", "Tipe Data", "Deskripsi"])
 
     st.dataframe(data_info, use_container_width=True)
 
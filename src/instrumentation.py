@@ -0,0 +1,516 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# File pengaturan yang dibaca ulang saat berubah, sehingga profiler dan
+# tracemalloc bisa dinyalakan di produksi tanpa deploy ulang, misalnya:
+#   {"profiler": true, "profiler_interval_ms": 5, "tracemalloc": true}
+CONFIG_PATH = os.environ.get('INSTRUMENTATION_CONFIG', 'src/instrumentation.json')
+# Endpoint metrik lokal (hanya 127.0.0.1), 0 untuk menonaktifkan
+METRICS_PORT = int(os.environ.get('INSTRUMENTATION_PORT', 8502))
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'tracemalloc': False,
+    'profiler': False,
+    'profiler_interval_ms': 10.0,
+    'profiler_max_stacks': 10_000
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false', '1', '0'):
+        return value.strip().lower() in ('true', '1')
+    raise ValueError('harus berupa boolean')
+
+
+def _to_positive(cast):
+    def convert(value):
+        if isinstance(value, bool):
+            raise ValueError('harus berupa angka')
+        try:
+            number = cast(value)
+        except (TypeError, ValueError):
+            raise ValueError('harus berupa angka') from None
+        if not number > 0 or (cast is int and number != float(value)):
+            raise ValueError('harus berupa angka positif' + (' bulat' if cast is int else ''))
+        return number
+    return convert
+
+
+SETTING_TYPES = {
+    'enabled': _to_bool,
+    'tracemalloc': _to_bool,
+    'profiler': _to_bool,
+    'profiler_interval_ms': _to_positive(float),
+    'profiler_max_stacks': _to_positive(int)
+}
+
+
+def validate_settings(settings):
+    """Pengaturan dengan tipe yang sudah disamakan; ValueError jika ada yang tidak valid."""
+    if not isinstance(settings, dict):
+        raise ValueError('Pengaturan harus berupa objek JSON')
+    unknown = set(settings) - set(DEFAULT_SETTINGS)
+    if unknown:
+        raise ValueError(f'Pengaturan tidak dikenal: {sorted(unknown)}')
+    result = {}
+    for name, value in settings.items():
+        try:
+            result[name] = SETTING_TYPES[name](value)
+        except ValueError as exc:
+            raise ValueError(f'{name} {exc}: {value!r}') from None
+    return result
+
+
+class _StageStats:
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.peak_bytes = 0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds, peak_bytes):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        if peak_bytes is not None:
+            self.peak_bytes = max(self.peak_bytes, peak_bytes)
+
+    def summary(self):
+        recent = np.fromiter(self.recent, dtype=float)
+        p50, p99 = np.percentile(recent, [50, 99]) * 1000 if len(recent) else (None, None)
+        return {
+            'count': self.count, 'total_ms': self.total * 1000, 'mean_ms': self.total / self.count * 1000,
+            'p50_ms': p50, 'p99_ms': p99, 'max_ms': self.max * 1000, 'peak_bytes': self.peak_bytes or None
+        }
+
+
+class _Frame:
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.base_bytes = None
+        self.peak = 0
+
+
+class Instrumentation:
+    """Waktu dan alokasi memori per halaman dan per tahap (stage) di dashboard.
+
+    `page_run(page)` membungkus satu eksekusi halaman, `stage(name)` membungkus
+    tahap di dalamnya (boleh bertingkat, nama tahap digabung dengan '/'). Setiap
+    page run ditulis sebagai satu baris log JSON dan diringkas per (halaman,
+    tahap) untuk endpoint metrik. Memori diukur dengan tracemalloc yang bersifat
+    global per proses (reset_peak menghapus puncak milik semua thread), jadi
+    puncak alokasi hanya dicatat untuk page run yang tidak tumpang tindih dengan
+    page run lain; page run yang bersamaan tetap dicatat waktunya dengan
+    peak_bytes None (lihat `memory_skipped` di ringkasan).
+    """
+
+    def __init__(self, config_path=CONFIG_PATH, window=1_000, check_interval=1.0):
+        self.config_path = config_path
+        self.window = window
+        self.check_interval = check_interval
+        self.settings = dict(DEFAULT_SETTINGS)
+        self._overrides = {}
+        self._config_mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+        self._active_threads = {}
+        # Thread yang page run-nya pernah berjalan bersamaan page run lain
+        self._overlapped = set()
+        self._profiler = None
+        self.runs = 0
+        self.errors = 0
+        self.memory_skipped = 0
+
+    # Pengaturan
+
+    def _refresh_settings(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._config_mtime:
+            self._config_mtime = mtime
+            file_settings = {}
+            if mtime is not None:
+                try:
+                    with open(self.config_path) as f:
+                        file_settings = validate_settings(json.load(f))
+                except (OSError, ValueError):
+                    logger.exception('Gagal membaca %s, pengaturan instrumentasi tidak berubah', self.config_path)
+                    return
+            self._apply({**DEFAULT_SETTINGS, **file_settings, **self._overrides})
+
+    def configure(self, **settings):
+        """Ubah pengaturan saat runtime (dipakai endpoint POST /config).
+
+        Pengaturan divalidasi dulu; jika ada yang tidak valid tidak ada yang berubah.
+        """
+        settings = validate_settings(settings)
+        self._apply({**self.settings, **settings})
+        with self._lock:
+            self._overrides.update(settings)
+
+    def _apply(self, settings):
+        previous = self.settings
+        if settings['tracemalloc'] and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not settings['tracemalloc'] and previous['tracemalloc'] and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if settings['profiler'] and self._profiler is None:
+            self._profiler = SamplingProfiler(self, settings['profiler_interval_ms'], settings['profiler_max_stacks'])
+            self._profiler.start()
+        elif not settings['profiler'] and self._profiler is not None:
+            self._profiler.stop()
+        elif self._profiler is not None:
+            self._profiler.interval = settings['profiler_interval_ms'] / 1000
+        self.settings = settings
+        if settings != previous:
+            logger.info('Pengaturan instrumentasi: %s', json.dumps(settings))
+
+    # Pengukuran
+
+    def _memory(self):
+        return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+
+    def _push(self, name):
+        stack = self._local.stack
+        frame = _Frame(name)
+        # Di bawah lock supaya tidak ada page run lain yang mulai di antara
+        # pemeriksaan dan reset_peak
+        with self._lock:
+            memory = None if threading.get_ident() in self._overlapped else self._memory()
+            if memory is not None:
+                current, peak = memory
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, peak)
+                tracemalloc.reset_peak()
+                frame.base_bytes = current
+                frame.peak = current
+        stack.append(frame)
+        return frame
+
+    def _pop(self):
+        stack = self._local.stack
+        frame = stack.pop()
+        seconds = time.perf_counter() - frame.start
+        peak_bytes = None
+        with self._lock:
+            memory = None if threading.get_ident() in self._overlapped else self._memory()
+        if memory is not None and frame.base_bytes is not None:
+            frame.peak = max(frame.peak, memory[1])
+            peak_bytes = frame.peak - frame.base_bytes
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, frame.peak)
+        return seconds, peak_bytes
+
+    def _record(self, page, stage, seconds, peak_bytes):
+        key = (page, stage)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _StageStats(self.window)
+            stats.add(seconds, peak_bytes)
+
+    @contextmanager
+    def page_run(self, page):
+        try:
+            self._refresh_settings()
+        except Exception:
+            # Instrumentasi tidak boleh membuat halaman gagal
+            logger.exception('Gagal memperbarui pengaturan instrumentasi')
+        if not self.settings['enabled']:
+            yield
+            return
+        self._local.stack = []
+        self._local.page = page
+        self._local.stages = []
+        run_id = uuid.uuid4().hex[:12]
+        thread_id = threading.get_ident()
+        with self._lock:
+            if self._active_threads:
+                # Puncak tracemalloc tidak bisa dipisah per thread, semua page run
+                # yang sedang berjalan tidak lagi mencatat memori
+                self._overlapped.update(self._active_threads)
+                self._overlapped.add(thread_id)
+            self._active_threads[thread_id] = page
+        self._push(page)
+        error = None
+        try:
+            yield
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            seconds, peak_bytes = self._pop()
+            with self._lock:
+                self._active_threads.pop(thread_id, None)
+                if thread_id in self._overlapped:
+                    self._overlapped.discard(thread_id)
+                    if self.settings['tracemalloc']:
+                        self.memory_skipped += 1
+                self.runs += 1
+                # Streamlit menghentikan run lama saat sesi melakukan rerun, itu bukan error
+                if error is not None and error not in ('RerunException', 'StopException'):
+                    self.errors += 1
+            self._record(page, None, seconds, peak_bytes)
+            logger.info(json.dumps({
+                'event': 'page_run', 'run_id': run_id, 'page': page, 'ms': round(seconds * 1000, 3),
+                'peak_bytes': peak_bytes, 'error': error, 'stages': self._local.stages
+            }))
+            self._local.page = None
+
+    @contextmanager
+    def stage(self, name):
+        page = getattr(self._local, 'page', None)
+        if page is None:
+            # Di luar page run (CLI, service): tidak dicatat
+            yield
+            return
+        stack = self._local.stack
+        path = '/'.join([frame.name for frame in stack[1:]] + [name])
+        self._push(name)
+        try:
+            yield
+        finally:
+            seconds, peak_bytes = self._pop()
+            self._record(page, path, seconds, peak_bytes)
+            self._local.stages.append({'stage': path, 'ms': round(seconds * 1000, 3), 'peak_bytes': peak_bytes})
+
+    def active_threads(self):
+        with self._lock:
+            return dict(self._active_threads)
+
+    def summary(self):
+        from prediction_cache import prediction_cache_summary
+        from startup_timing import import_timings
+
+        with self._lock:
+            pages = {}
+            for (page, stage), stats in sorted(self._stats.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                entry = pages.setdefault(page, {'stages': {}})
+                if stage is None:
+                    entry.update(stats.summary())
+                else:
+                    entry['stages'][stage] = stats.summary()
+            summary = {'runs': self.runs, 'errors': self.errors, 'memory_skipped': self.memory_skipped, 'pages': pages}
+        summary['settings'] = self.settings
+        summary['imports_ms'] = {name: seconds * 1000 for name, seconds in import_timings().items()}
+        # Cache hasil prediksi halaman Prediksi (hit rate, waktu yang dihemat)
+        cache = prediction_cache_summary()
+        if cache is not None:
+            summary['prediction_cache'] = cache
+        if tracemalloc.is_tracing():
+            current, _ = tracemalloc.get_traced_memory()
+            summary['traced_bytes'] = current
+        if self._profiler is not None:
+            summary['profiler'] = self._profiler.summary()
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.runs = 0
+            self.errors = 0
+            self.memory_skipped = 0
+        if self._profiler is not None:
+            self._profiler.reset()
+
+
+class SamplingProfiler:
+    """Profiler sampling berbasis sys._current_frames untuk thread yang sedang menjalankan halaman.
+
+    Setiap `interval` stack thread tersebut diambil dan dihitung dalam format
+    collapsed (frame dipisah ';'), yang bisa langsung dipakai flamegraph.pl
+    atau speedscope. Overhead-nya kecil karena thread target tidak dihentikan.
+    """
+
+    def __init__(self, instrumentation, interval_ms=10.0, max_stacks=10_000):
+        self.instrumentation = instrumentation
+        self.interval = interval_ms / 1000
+        self.max_stacks = max_stacks
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='sampling-profiler', daemon=True)
+        self.samples = 0
+        self.dropped = 0
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.instrumentation._profiler = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            active = self.instrumentation.active_threads()
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, page in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+                    frame = frame.f_back
+                stack = ';'.join([page] + names[::-1])
+                with self._lock:
+                    self.samples += 1
+                    if stack in self._counts:
+                        self._counts[stack] += 1
+                    elif len(self._counts) < self.max_stacks:
+                        self._counts[stack] = 1
+                    else:
+                        self.dropped += 1
+
+    def collapsed(self):
+        with self._lock:
+            counts = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return '\n'.join(f'{stack} {count}' for stack, count in counts)
+
+    def summary(self, top=10):
+        with self._lock:
+            counts = list(self._counts.items())
+            samples, dropped = self.samples, self.dropped
+        # Fungsi paling dalam (tanpa nomor baris) sebagai gambaran cepat hotspot
+        leaves = {}
+        for stack, count in counts:
+            leaf = stack.rsplit(';', 1)[-1].rsplit(':', 1)[0]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        hotspots = sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            'interval_ms': self.interval * 1000, 'samples': samples, 'dropped': dropped,
+            'started_at': self.started_at,
+            'top': [{'frame': frame, 'samples': count} for frame, count in hotspots]
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self.samples = 0
+            self.dropped = 0
+
+
+def make_handler(instrumentation):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type='application/json'):
+            data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send(200, instrumentation.summary())
+            elif self.path == '/profile':
+                profiler = instrumentation._profiler
+                if profiler is None:
+                    self._send(404, {'error': 'profiler tidak aktif'})
+                else:
+                    self._send(200, profiler.collapsed(), 'text/plain; charset=utf-8')
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path == '/config':
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    instrumentation.configure(**json.loads(self.rfile.read(length) or b'{}'))
+                except (TypeError, ValueError) as exc:
+                    self._send(400, {'error': str(exc)})
+                    return
+                self._send(200, instrumentation.settings)
+            elif self.path == '/reset':
+                instrumentation.reset()
+                self._send(200, {'status': 'ok'})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return MetricsHandler
+
+
+_instrumentation = None
+_server = None
+_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation():
+    global _instrumentation
+    if _instrumentation is None:
+        with _instrumentation_lock:
+            if _instrumentation is None:
+                _instrumentation = Instrumentation()
+    return _instrumentation
+
+
+def stage(name):
+    return get_instrumentation().stage(name)
+
+
+def setup(port=METRICS_PORT):
+    """Dipanggil dari app.py: log JSON ke stderr dan endpoint metrik lokal."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    start_metrics_server(port)
+    return get_instrumentation()
+
+
+def start_metrics_server(port=METRICS_PORT, host='127.0.0.1'):
+    """Jalankan endpoint metrik di thread latar, sekali per proses."""
+    global _server
+    if not port or _server is not None:
+        return _server or None
+    instrumentation = get_instrumentation()
+    with _instrumentation_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), make_handler(instrumentation))
+            except OSError as exc:
+                logger.warning('Endpoint metrik tidak dijalankan di %s:%d (%s)', host, port, exc)
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+            logger.info('Metrik instrumentasi di http://%s:%d/metrics', host, port)
+    return _server or None
@@ -0,0 +1,144 @@
+import hashlib
+import io
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+
+MODEL_PATH = 'src/model_terbaik.pkl'
+
+# Urutan 17 kolom input model (sama dengan dict `pengunjung` di predict.py)
+FEATURE_COLUMNS = [
+    'Administrative', 'Administrative_Duration', 'Informational', 'Informational_Duration',
+    'ProductRelated', 'ProductRelated_Duration', 'BounceRates', 'ExitRates', 'PageValues',
+    'SpecialDay', 'Month', 'OperatingSystems', 'Browser', 'Region', 'TrafficType',
+    'VisitorType', 'Weekend'
+]
+
+logger = logging.getLogger(__name__)
+
+# Snapshot model yang sedang aktif. Seluruh atribut disimpan dalam satu objek
+# supaya pergantian model cukup dengan satu assignment (atomik bagi pembaca).
+LoadedModel = namedtuple('LoadedModel', ['model', 'version', 'sha256', 'mtime_ns', 'load_seconds', 'loaded_at'])
+
+
+class _ModelUnpickler(pickle.Unpickler):
+    # Pipeline disimpan dari notebook/app.py sehingga add_custom_features
+    # direferensikan sebagai __main__.add_custom_features. Di luar Streamlit
+    # (CLI, service) __main__ tidak memilikinya, jadi pakai definisi bersama.
+    def find_class(self, module, name):
+        try:
+            return super().find_class(module, name)
+        except AttributeError:
+            if module == '__main__' and name == 'add_custom_features':
+                from features import add_custom_features
+                return add_custom_features
+            raise
+
+
+def load_pickle(data):
+    return _ModelUnpickler(io.BytesIO(data)).load()
+
+
+def predicted_classes(model, proba):
+    """Kelas dengan probabilitas tertinggi, sama seperti predict() pada classifier sklearn/XGBoost."""
+    import numpy as np
+    classes = getattr(model, 'classes_', np.array([False, True]))
+    return classes[proba.argmax(axis=1)]
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """Memuat model sekali per proses dan menggantinya saat file model berubah."""
+
+    def __init__(self, path=MODEL_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._current = None
+        self._load_lock = threading.Lock()
+        self._last_check = 0.0
+        self.history = []
+
+    def get(self):
+        return self.snapshot().model
+
+    def snapshot(self):
+        current = self._current
+        if current is None:
+            # Belum ada model sama sekali, pemanggil pertama wajib menunggu
+            with self._load_lock:
+                if self._current is None:
+                    self._reload()
+            return self._current
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            # Hanya satu thread yang memeriksa/memuat ulang, thread lain tetap
+            # memakai snapshot lama sehingga request yang berjalan tidak terblokir
+            if self._load_lock.acquire(blocking=False):
+                try:
+                    self._last_check = now
+                    self._refresh_if_changed()
+                finally:
+                    self._load_lock.release()
+        return self._current
+
+    def _refresh_if_changed(self):
+        current = self._current
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            logger.warning('File model %s tidak dapat dibaca, tetap memakai versi %s', self.path, current.version)
+            return
+        if mtime_ns == current.mtime_ns:
+            return
+        sha256 = file_sha256(self.path)
+        if sha256 == current.sha256:
+            # Hanya timestamp yang berubah, isi model sama
+            self._current = current._replace(mtime_ns=mtime_ns)
+            return
+        try:
+            self._reload()
+        except Exception:
+            logger.exception('Gagal memuat ulang model dari %s, tetap memakai versi %s', self.path, current.version)
+
+    def _reload(self):
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        start = time.perf_counter()
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        model = load_pickle(data)
+        load_seconds = time.perf_counter() - start
+        sha256 = hashlib.sha256(data).hexdigest()
+
+        version = 1 if self._current is None else self._current.version + 1
+        self._current = LoadedModel(model, version, sha256, mtime_ns, load_seconds, time.time())
+        self._last_check = time.monotonic()
+        self.history.append({'version': version, 'sha256': sha256, 'load_seconds': load_seconds})
+        logger.info('Model %s versi %d dimuat dalam %.1f ms (sha256 %s)', self.path, version, load_seconds * 1000, sha256[:12])
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(path=MODEL_PATH):
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(path)
+    return _registry
+
+
+def get_model():
+    return get_registry().get()
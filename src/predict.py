@@ -1,11 +1,24 @@
 import streamlit as st
-import pandas as pd
-from PIL import Image
-import pickle
+import os
+import tempfile
+from model_registry import get_registry
+from shared_store import shared_model_snapshot
+from compiled_model import get_compiled_model
+from prediction_cache import get_prediction_cache, model_predictor
+import batch_predict
+from instrumentation import stage
+
+# Hasil batch di halaman ini dibaca utuh ke memori untuk tombol unduh, jadi
+# jumlah barisnya dibatasi. File penuh: python src/batch_predict.py in out
+BATCH_UI_MAX_ROWS = int(os.environ.get('BATCH_UI_MAX_ROWS', 200_000))
 
 def run():
-    with open('src/model_terbaik.pkl', 'rb') as file_1:
-        model = pickle.load(file_1)
+    # Model dimuat sekali per proses dan dibagi ke semua sesi/rerun. Dalam mode
+    # multi-proses (serve_pool.py) model terkompilasi dibaca dari shared memory
+    # sehingga pickle tidak perlu dimuat di setiap worker.
+    with stage('model_load'):
+        loaded = shared_model_snapshot() or get_registry().snapshot()
+    model = loaded.model
 
     st.title('Prediksi Pengunjung Berpotensi Membeli atau Tidak')
 
@@ -61,12 +74,45 @@ def run():
         'Weekend': Weekend
     }
 
-    df = pd.DataFrame([pengunjung])
-
     if submitted:
-        pred = model.predict(df)
+        # Model terkompilasi (compiled_model.py) jika sudah diekspor untuk pickle yang sama.
+        # Sesi dengan input identik diambil dari cache hasil prediksi.
+        with stage('model_load_compiled'):
+            compiled = get_compiled_model(loaded.sha256)
+        with stage('inference'):
+            pred = get_prediction_cache().predict_many([pengunjung], model_predictor(model, compiled), loaded.sha256)[0]
         hasil = 'Akan Membeli' if pred[0] else 'Tidak Membeli'
         st.write(f"### Hasil Prediksi: **{hasil}**")
+        st.caption(f"Model versi {loaded.version} (dimuat dalam {loaded.load_seconds * 1000:.0f} ms)")
+
+    st.markdown("---")
+    st.markdown("### Prediksi Batch")
+    st.markdown("Unggah file CSV atau Parquet berisi sesi pengunjung dengan 17 kolom yang sama seperti form di atas")
+    st.caption(f"Maksimal {BATCH_UI_MAX_ROWS:,} baris. Untuk file yang lebih besar gunakan "
+               "`python src/batch_predict.py input.csv hasil.parquet`")
+
+    uploaded = st.file_uploader('File sesi pengunjung', type=['csv', 'parquet'])
+    output_format = st.radio('Format hasil', ['csv', 'parquet'], horizontal=True)
+
+    if uploaded is not None and st.button('Jalankan Prediksi Batch'):
+        progress_text = st.empty()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = os.path.join(tmpdir, f'hasil_prediksi.{output_format}')
+            with stage('batch_inference'):
+                stats = batch_predict.score_file(
+                    uploaded, output_path, output_format=output_format, model=model,
+                    progress=lambda rows: progress_text.write(f'{rows:,} baris diproses...'),
+                    max_rows=BATCH_UI_MAX_ROWS
+                )
+            with open(output_path, 'rb') as f:
+                hasil_batch = f.read()
+
+        progress_text.write(f"{stats['rows']:,} baris diprediksi dalam {stats['seconds']:.2f} detik "
+                            f"({stats['rows_per_second']:,.0f} baris/detik)")
+        if stats['truncated']:
+            st.warning(f"File berisi lebih dari {BATCH_UI_MAX_ROWS:,} baris, hanya {stats['rows']:,} baris pertama "
+                       "yang diprediksi. Gunakan `python src/batch_predict.py` untuk seluruh file.")
+        st.download_button('Unduh Hasil Prediksi', hasil_batch, file_name=f'hasil_prediksi.{output_format}')
 
 if __name__ == '__main__':
     run()
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from model_registry import FEATURE_COLUMNS, predicted_classes
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_SIZE', 100_000))
+DEFAULT_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+# Langkah kuantisasi (0 = nilai persis). Misalnya 1 untuk durasi berarti durasi
+# dibulatkan ke detik terdekat sebelum dijadikan kunci dan diprediksi.
+DEFAULT_DURATION_STEP = float(os.environ.get('PREDICTION_CACHE_DURATION_STEP', 0))
+DEFAULT_RATE_STEP = float(os.environ.get('PREDICTION_CACHE_RATE_STEP', 0))
+
+DURATION_FIELDS = ['Administrative_Duration', 'Informational_Duration', 'ProductRelated_Duration']
+RATE_FIELDS = ['BounceRates', 'ExitRates']
+TEXT_FIELDS = ['Month', 'VisitorType']
+# Jumlah halaman dan kode kategori tetap int supaya encoder model menerima tipe yang sama
+INT_FIELDS = ['Administrative', 'Informational', 'ProductRelated', 'OperatingSystems', 'Browser', 'Region', 'TrafficType']
+
+
+def _quantize(value, step):
+    return round(value / step) * step if step else value
+
+
+class PredictionCache:
+    """Cache LRU/TTL hasil prediksi per sesi, dikunci dengan hash kanonik 17 kolom input.
+
+    Nilai numerik dinormalkan (2 dan 2.0 memberi kunci yang sama) dan kolom
+    durasi/rate bisa dikuantisasi. Saat kuantisasi aktif, model juga
+    menerima nilai yang sudah dibulatkan sehingga hasil untuk satu kunci tidak
+    bergantung pada sesi mana yang pertama masuk. Seluruh isi cache dibuang
+    saat sha256 model berubah.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 duration_step=DEFAULT_DURATION_STEP, rate_step=DEFAULT_RATE_STEP):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.steps = {col: duration_step for col in DURATION_FIELDS}
+        self.steps.update({col: rate_step for col in RATE_FIELDS})
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.model_sha256 = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lookup_seconds = 0.0
+        self.predict_seconds = 0.0
+        self.predicted_rows = 0
+
+    def canonical(self, record):
+        """Record dengan tipe dan kuantisasi yang sama untuk setiap sesi yang setara."""
+        result = {}
+        for col in FEATURE_COLUMNS:
+            value = record[col]
+            if col in TEXT_FIELDS:
+                value = str(value)
+            elif col == 'Weekend':
+                value = bool(value)
+            elif col in INT_FIELDS and float(value).is_integer():
+                value = int(value)
+            else:
+                # + 0.0 menyamakan -0.0 dengan 0.0
+                value = _quantize(float(value), self.steps.get(col)) + 0.0
+            result[col] = value
+        return result
+
+    @staticmethod
+    def key(canonical):
+        text = repr(tuple(canonical[col] for col in FEATURE_COLUMNS))
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def _check_model(self, model_sha256):
+        if model_sha256 != self.model_sha256:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.model_sha256 = model_sha256
+
+    def predict_many(self, records, predict, model_sha256):
+        """Hasil prediksi untuk setiap record, memanggil `predict` hanya untuk yang belum ada.
+
+        `predict` menerima list record kanonik yang unik dan mengembalikan satu
+        hasil per record (misalnya tuple kelas dan probabilitas).
+        """
+        start = time.perf_counter()
+        canonical = [self.canonical(record) for record in records]
+        keys = [self.key(record) for record in canonical]
+        now = time.monotonic()
+        results = [None] * len(records)
+        missing = {}
+        with self._lock:
+            self._check_model(model_sha256)
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] < now:
+                    del self._entries[key]
+                    self.expired += 1
+                    entry = None
+                if entry is None:
+                    # Sesi identik dalam satu batch diprediksi sekali saja
+                    missing.setdefault(key, []).append(i)
+                    continue
+                self._entries.move_to_end(key)
+                results[i] = entry[0]
+            self.hits += len(records) - sum(map(len, missing.values()))
+            self.misses += sum(map(len, missing.values()))
+            self.lookup_seconds += time.perf_counter() - start
+
+        if missing:
+            unique = [canonical[indices[0]] for indices in missing.values()]
+            predict_start = time.perf_counter()
+            values = predict(unique)
+            predict_seconds = time.perf_counter() - predict_start
+            expires = time.monotonic() + self.ttl
+            with self._lock:
+                self.predict_seconds += predict_seconds
+                self.predicted_rows += len(unique)
+                # Model bisa saja berganti selama prediksi, hasilnya tidak disimpan
+                store = self.model_sha256 == model_sha256
+                for (key, indices), value in zip(missing.items(), values):
+                    for i in indices:
+                        results[i] = value
+                    if store:
+                        self._entries[key] = (value, expires)
+                        self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            per_row = self.predict_seconds / self.predicted_rows if self.predicted_rows else None
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'quantize': {col: step for col, step in self.steps.items() if step},
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else None,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'lookup_ms_per_row': self.lookup_seconds / requests * 1000 if requests else None,
+                'predict_ms_per_row': per_row * 1000 if per_row is not None else None,
+                # Perkiraan waktu inferensi yang dihemat oleh hit
+                'saved_seconds': self.hits * per_row if per_row is not None else None
+            }
+
+
+def model_predictor(model, compiled=None):
+    """Fungsi `predict` untuk predict_many: tuple (kelas, probabilitas membeli) per record."""
+    if compiled is None and hasattr(model, 'predict_one'):
+        compiled = model
+
+    def predict(records):
+        if compiled is not None:
+            if len(records) == 1:
+                return [compiled.predict_one(records[0])]
+            proba = compiled.predict_proba(records)[:, 1]
+            return [(int(p > 0.5), float(p)) for p in proba]
+        import pandas as pd
+        proba = model.predict_proba(pd.DataFrame.from_records(records, columns=FEATURE_COLUMNS))
+        return list(zip(predicted_classes(model, proba).tolist(), proba[:, 1].tolist()))
+    return predict
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache()
+    return _cache
+
+
+def prediction_cache_summary():
+    """Ringkasan cache proses ini untuk endpoint metrik, None jika belum dipakai."""
+    return _cache.summary() if _cache is not None else None
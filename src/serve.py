@@ -0,0 +1,287 @@
+import argparse
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from model_registry import FEATURE_COLUMNS, MODEL_PATH, ModelRegistry
+from prediction_cache import INT_FIELDS, TEXT_FIELDS, PredictionCache, model_predictor
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """Menyimpan latensi terakhir dan histogram ukuran batch untuk endpoint /metrics."""
+
+    def __init__(self, window=10_000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = {}
+        self.requests = 0
+        self.batches = 0
+
+    def record_request(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+
+    def record_batch(self, size):
+        # Bucket pangkat dua: 1, 2, 4, 8, ...
+        bucket = 1 << (size - 1).bit_length()
+        with self._lock:
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            self.batches += 1
+
+    def summary(self):
+        with self._lock:
+            latencies = np.fromiter(self._latencies, dtype=float)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            requests, batches = self.requests, self.batches
+        if len(latencies):
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        else:
+            p50 = p99 = None
+        return {
+            'requests': requests,
+            'batches': batches,
+            'latency_ms': {'p50': p50, 'p99': p99, 'window': len(latencies)},
+            'batch_size_histogram': {f'<={k}': v for k, v in batch_sizes.items()}
+        }
+
+
+class MicroBatcher:
+    """Menggabungkan request yang datang bersamaan menjadi satu panggilan predict_proba.
+
+    Dengan `cache` (PredictionCache), hanya sesi yang belum pernah diprediksi
+    untuk model yang sama yang dikirim ke model.
+    """
+
+    def __init__(self, registry, max_batch_size=256, max_wait_ms=2.0, stats=None, cache=None):
+        self.registry = registry
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or LatencyStats()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, records):
+        future = Future()
+        self._queue.put((records, future))
+        return future
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        rows = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(item)
+            rows += len(item[0])
+        return pending, rows
+
+    def _predict(self, records):
+        snapshot = self.registry.snapshot()
+        predict = model_predictor(snapshot.model)
+        if self.cache is not None:
+            return self.cache.predict_many(records, predict, snapshot.sha256)
+        return predict(records)
+
+    @staticmethod
+    def _resolve(future, results):
+        future.set_result([
+            {'prediction': label, 'probability': probability}
+            for label, probability in results
+        ])
+
+    def _loop(self):
+        while True:
+            pending, rows = self._collect()
+            try:
+                results = self._predict([record for item_records, _ in pending for record in item_records])
+            except Exception as exc:
+                if len(pending) == 1:
+                    pending[0][1].set_exception(exc)
+                    continue
+                # Ulangi per request supaya satu sesi bermasalah tidak
+                # menggagalkan request lain di batch yang sama
+                logger.warning('Batch %d sesi gagal (%s), diulang per request', rows, exc)
+                for item_records, future in pending:
+                    try:
+                        self._resolve(future, self._predict(item_records))
+                    except Exception as item_exc:
+                        future.set_exception(item_exc)
+                continue
+
+            self.stats.record_batch(rows)
+            offset = 0
+            for item_records, future in pending:
+                n = len(item_records)
+                self._resolve(future, results[offset:offset + n])
+                offset += n
+
+
+def process_memory(pid=None):
+    """RSS dan PSS proses (byte). PSS membagi halaman bersama (shared memory,
+    copy-on-write) rata ke semua proses yang memakainya, jadi jumlah PSS semua
+    worker adalah memori sebenarnya."""
+    memory = {'pid': pid or os.getpid()}
+    try:
+        with open(f"/proc/{pid or 'self'}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    memory[key.lower() + '_bytes'] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def _coerce(col, value):
+    if col in TEXT_FIELDS:
+        if not isinstance(value, str):
+            raise ValueError('harus berupa teks')
+        return value
+    if col == 'Weekend':
+        if isinstance(value, bool) or value in (0, 1):
+            return bool(value)
+        raise ValueError('harus berupa boolean')
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError('harus berupa angka')
+    if col in INT_FIELDS:
+        if not float(value).is_integer():
+            raise ValueError('harus berupa bilangan bulat')
+        return int(value)
+    return float(value)
+
+
+def validate_records(payload):
+    """Periksa dan samakan tipe setiap sesi sebelum masuk antrean micro-batch."""
+    records = payload if isinstance(payload, list) else [payload]
+    if not records:
+        raise ValueError('Request tidak berisi sesi')
+    validated = []
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f'Sesi ke-{i} harus berupa objek JSON')
+        missing = [col for col in FEATURE_COLUMNS if col not in record]
+        if missing:
+            raise ValueError(f'Sesi ke-{i} tidak memiliki kolom: {missing}')
+        clean = {}
+        for col in FEATURE_COLUMNS:
+            try:
+                clean[col] = _coerce(col, record[col])
+            except ValueError as exc:
+                raise ValueError(f'Sesi ke-{i} kolom {col} {exc}: {record[col]!r}') from None
+        validated.append(clean)
+    return validated
+
+
+def make_handler(batcher, request_timeout=10.0):
+    class PredictHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            elif self.path == '/metrics':
+                snapshot = batcher.registry.snapshot()
+                metrics = batcher.stats.summary()
+                metrics['model'] = {'version': snapshot.version, 'sha256': snapshot.sha256,
+                                    'load_seconds': snapshot.load_seconds}
+                if batcher.cache is not None:
+                    metrics['prediction_cache'] = batcher.cache.summary()
+                metrics['process'] = process_memory()
+                self._send_json(200, metrics)
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': 'not found'})
+                return
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length))
+                records = validate_records(payload)
+            except ValueError as exc:
+                self._send_json(400, {'error': str(exc)})
+                return
+
+            try:
+                results = batcher.submit(records).result(timeout=request_timeout)
+            except Exception as exc:
+                logger.exception('Prediksi gagal')
+                self._send_json(500, {'error': str(exc)})
+                return
+
+            batcher.stats.record_request(time.perf_counter() - start)
+            self._send_json(200, results if isinstance(payload, list) else results[0])
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return PredictHandler
+
+
+def add_arguments(parser):
+    """Argumen CLI service, dipakai juga oleh serve_pool.py."""
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model', default=MODEL_PATH, help='Path file model pickle')
+    parser.add_argument('--max-batch-size', type=int, default=256, help='Jumlah sesi maksimum per micro-batch')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='Waktu tunggu maksimum untuk mengisi micro-batch')
+    parser.add_argument('--cache-size', type=int, default=100_000, help='Jumlah sesi di cache hasil prediksi (0 = nonaktif)')
+    parser.add_argument('--cache-ttl', type=float, default=3600, help='Umur entri cache dalam detik')
+    parser.add_argument('--quantize-duration', type=float, default=0, help='Langkah pembulatan kolom durasi untuk kunci cache')
+    parser.add_argument('--quantize-rate', type=float, default=0, help='Langkah pembulatan BounceRates/ExitRates untuk kunci cache')
+
+
+def make_batcher(registry, args):
+    cache = None
+    if args.cache_size > 0:
+        cache = PredictionCache(args.cache_size, args.cache_ttl, args.quantize_duration, args.quantize_rate)
+    return MicroBatcher(registry, args.max_batch_size, args.max_wait_ms, cache=cache)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HTTP service untuk prediksi pengunjung')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    registry = ModelRegistry(args.model)
+    registry.get()  # preload sebelum menerima request
+    batcher = make_batcher(registry, args)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(batcher))
+    logger.info('Melayani prediksi di http://%s:%d/predict', args.host, args.port)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import serve
+import shared_store
+from model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolServer(ThreadingHTTPServer):
+    # Thread handler bukan daemon supaya server_close() menunggu request yang
+    # sedang berjalan sebelum worker keluar
+    daemon_threads = False
+    block_on_close = True
+
+
+class _FixedRegistry:
+    # Worker tidak memuat ulang model sendiri: supervisor membuat generasi
+    # worker baru saat file model berubah
+    def __init__(self, loaded):
+        self._loaded = loaded
+
+    def snapshot(self):
+        return self._loaded
+
+    def get(self):
+        return self._loaded.model
+
+
+class ServePool:
+    """Supervisor pre-fork: satu salinan model dan dataset untuk banyak proses worker.
+
+    Model terkompilasi (compiled_model.py) dan kolom dataset disalin sekali ke
+    shared memory (shared_store.py). Worker prediksi di-fork dari supervisor,
+    berbagi socket yang sama dan memakai view array di shared memory. Pipeline
+    yang tidak bisa dikompilasi dibagi lewat copy-on-write (gc.freeze sebelum
+    fork supaya GC tidak menyentuh objek warisan). Worker Streamlit opsional
+    dijalankan sebagai proses terpisah dan attach ke segmen yang sama lewat
+    file penunjuk (shared_store.POINTER_ENV).
+
+    Saat file model berubah, model baru dipublikasikan, generasi worker baru
+    di-fork, lalu worker lama dihentikan setelah request yang berjalan selesai.
+    File penunjuk ditulis ulang sehingga worker Streamlit attach ke segmen baru
+    pada rerun berikutnya tanpa dijalankan ulang.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.registry = ModelRegistry(args.model, check_interval=args.check_interval)
+        self.server = None
+        self.loaded = None
+        self.model_segment = None
+        self.dataset_segment = None
+        self.pointer_path = os.path.join(tempfile.gettempdir(), f'ppi_pointer_{os.getpid()}.json')
+        self.generation = 0
+        self.workers = {}
+        self.streamlit = {}
+        self._stopping = False
+
+    # Publikasi ke shared memory
+
+    def write_pointer(self):
+        shared_store.write_pointer(self.pointer_path, {
+            shared_store.MODEL_SEGMENT_ENV: self.model_segment.name if self.model_segment else None,
+            shared_store.DATASET_SEGMENT_ENV: self.dataset_segment.name if self.dataset_segment else None,
+        })
+
+    def publish_model(self):
+        from compiled_model import export_pipeline, get_compiled_model
+
+        loaded = self.registry.snapshot()
+        compiled = get_compiled_model(loaded.sha256)
+        if compiled is None:
+            try:
+                compiled = export_pipeline(loaded.model, loaded.sha256)
+            except NotImplementedError as exc:
+                logger.warning('Model tidak bisa dikompilasi (%s), worker memakai pickle lewat copy-on-write', exc)
+
+        old_segment = self.model_segment
+        segment = None
+        if compiled is not None:
+            try:
+                segment = shared_store.publish_model(compiled, {
+                    'version': loaded.version, 'path': os.path.abspath(self.args.model), 'mtime_ns': loaded.mtime_ns,
+                    'load_seconds': loaded.load_seconds, 'loaded_at': loaded.loaded_at
+                })
+            except OSError as exc:
+                logger.warning('Model tidak dibagi lewat shared memory (%s), worker memakai pickle lewat copy-on-write', exc)
+        if segment is not None:
+            self.model_segment = segment
+            self.loaded = loaded._replace(model=shared_store.model_from_shared(segment))
+            logger.info('Model versi %d di shared memory %s (%.1f MB)', loaded.version, segment.name, segment.nbytes / 1e6)
+        else:
+            self.model_segment = None
+            self.loaded = loaded
+        self.write_pointer()
+
+        if old_segment is not None:
+            # Worker yang sudah attach tetap memetakan segmen lama sampai melepasnya
+            old_segment.close()
+            old_segment.unlink()
+
+    def publish_dataset(self):
+        import dataset
+        import eda_streaming
+
+        source = dataset.resolve_path()
+        if eda_streaming.should_stream(source):
+            # Dataset sebesar ini dibaca per chunk oleh halaman EDA, tidak dimuat utuh
+            logger.info('Dataset %s terlalu besar untuk dimuat utuh, tidak dibagi lewat shared memory', source)
+            return
+        df = dataset.load_dataset()
+        try:
+            self.dataset_segment = shared_store.publish_dataset(df, source)
+        except OSError as exc:
+            logger.warning('Dataset tidak dibagi lewat shared memory (%s), tiap worker memuat sendiri', exc)
+            return
+        self.write_pointer()
+        logger.info('Dataset %s (%d baris) di shared memory %s (%.1f MB)',
+                    source, len(df), self.dataset_segment.name, self.dataset_segment.nbytes / 1e6)
+
+    # Worker prediksi
+
+    def _freeze(self):
+        gc.collect()
+        gc.freeze()
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                logger.exception('Worker %d berhenti karena error', os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = self.generation
+        return pid
+
+    def _run_worker(self):
+        # Thread micro-batcher dibuat setelah fork, thread tidak ikut ter-fork
+        batcher = serve.make_batcher(_FixedRegistry(self.loaded), self.args)
+        server = self.server
+        handler = serve.make_handler(batcher)
+        # Koneksi keep-alive yang menganggur ditutup setelah timeout ini, jadi
+        # tidak menahan worker lama keluar
+        handler.timeout = self.args.idle_timeout
+        server.RequestHandlerClass = handler
+
+        def stop(signum, frame):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        logger.info('Worker %d (generasi %d) siap', os.getpid(), self.generation)
+        server.serve_forever()
+        # Menunggu request yang sedang diproses sebelum keluar
+        server.server_close()
+
+    def reap_workers(self):
+        for pid in list(self.workers):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if done == 0:
+                continue
+            generation = self.workers.pop(pid)
+            if generation == self.generation and not self._stopping:
+                logger.warning('Worker %d keluar (status %d), menjalankan pengganti', pid, status)
+                self.spawn_worker()
+
+    def reload_if_changed(self):
+        loaded = self.registry.snapshot()
+        if loaded.sha256 == self.loaded.sha256:
+            return
+        logger.info('Model berubah (sha256 %s), menjalankan generasi worker baru', loaded.sha256[:12])
+        old_workers = list(self.workers)
+        self.publish_model()
+        self.generation += 1
+        self._freeze()
+        for _ in range(self.args.workers):
+            self.spawn_worker()
+        for pid in old_workers:
+            self._signal(pid, signal.SIGTERM)
+
+    # Worker Streamlit
+
+    def start_streamlit(self, i):
+        env = dict(os.environ)
+        # Endpoint metrik instrumentasi tiap worker di port terpisah
+        env['INSTRUMENTATION_PORT'] = str(self.args.streamlit_metrics_port + i if self.args.streamlit_metrics_port else 0)
+        env[shared_store.POINTER_ENV] = self.pointer_path
+        port = self.args.streamlit_port + i
+        command = [sys.executable, '-m', 'streamlit', 'run', 'src/app.py', f'--server.port={port}',
+                   f'--server.address={self.args.host}', '--server.headless=true']
+        self.streamlit[i] = subprocess.Popen(command, env=env)
+        logger.info('Worker Streamlit %d di port %d (pid %d)', i, port, self.streamlit[i].pid)
+
+    def check_streamlit(self):
+        for i, process in list(self.streamlit.items()):
+            if process.poll() is not None and not self._stopping:
+                logger.warning('Worker Streamlit %d keluar (status %s), menjalankan ulang', i, process.returncode)
+                self.start_streamlit(i)
+
+    # Siklus hidup
+
+    def memory_report(self):
+        pids = [os.getpid()] + list(self.workers) + [p.pid for p in self.streamlit.values()]
+        memory = [serve.process_memory(pid) for pid in pids]
+        rss = sum(m.get('rss_bytes', 0) for m in memory)
+        pss = sum(m.get('pss_bytes', 0) for m in memory)
+        return {'processes': len(pids), 'rss_bytes': rss, 'pss_bytes': pss, 'per_process': memory}
+
+    def _signal(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def run(self):
+        self.registry.get()
+        self.publish_model()
+        if self.args.share_dataset:
+            self.publish_dataset()
+
+        self.server = _PoolServer((self.args.host, self.args.port), None)
+        # Semua worker menunggu accept() di socket yang sama; non-blocking supaya
+        # worker yang kalah berebut koneksi tidak tertahan di accept()
+        self.server.socket.setblocking(False)
+        self._freeze()
+        for _ in range(self.args.workers):
+            self.spawn_worker()
+        for i in range(self.args.streamlit):
+            self.start_streamlit(i)
+        logger.info('%d worker melayani prediksi di http://%s:%d/predict',
+                    self.args.workers, self.args.host, self.args.port)
+
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        reported = False
+        try:
+            while not self._stopping:
+                time.sleep(self.args.check_interval)
+                self.reap_workers()
+                self.check_streamlit()
+                self.reload_if_changed()
+                if not reported:
+                    report = self.memory_report()
+                    logger.info('Memori %d proses: RSS %.1f MB, PSS %.1f MB', report['processes'],
+                                report['rss_bytes'] / 1e6, report['pss_bytes'] / 1e6)
+                    reported = True
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stopping = True
+        for pid in self.workers:
+            self._signal(pid, signal.SIGTERM)
+        for process in self.streamlit.values():
+            process.terminate()
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        for process in self.streamlit.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.workers.clear()
+        if self.server is not None:
+            self.server.server_close()
+        for segment in (self.model_segment, self.dataset_segment):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+        try:
+            os.unlink(self.pointer_path)
+        except FileNotFoundError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Layanan prediksi multi-proses dengan model dan dataset di shared memory')
+    serve.add_arguments(parser)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Jumlah worker prediksi')
+    parser.add_argument('--streamlit', type=int, default=0, help='Jumlah worker dashboard Streamlit')
+    parser.add_argument('--streamlit-port', type=int, default=8501, help='Port worker Streamlit pertama')
+    parser.add_argument('--streamlit-metrics-port', type=int, default=8600,
+                        help='Port endpoint instrumentasi worker Streamlit pertama (0 = nonaktif)')
+    parser.add_argument('--no-dataset', dest='share_dataset', action='store_false',
+                        help='Jangan salin dataset ke shared memory')
+    parser.add_argument('--idle-timeout', type=float, default=5.0,
+                        help='Detik sebelum koneksi keep-alive yang menganggur ditutup')
+    parser.add_argument('--check-interval', type=float, default=1.0, help='Interval pemeriksaan worker dan file model (detik)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(name)s %(message)s')
+    ServePool(args).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+import errno
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+
+# Nama segmen shared memory yang dibuat supervisor (serve_pool.py) untuk worker
+MODEL_SEGMENT_ENV = 'SHARED_MODEL_SEGMENT'
+DATASET_SEGMENT_ENV = 'SHARED_DATASET_SEGMENT'
+# File JSON berisi nama segmen terbaru. Supervisor menulis ulang file ini saat
+# model berubah sehingga worker yang berjalan lama attach ke segmen baru tanpa
+# dijalankan ulang. Tanpa file ini nama segmen dibaca dari env di atas.
+POINTER_ENV = 'SHARED_STORE_POINTER'
+
+# tmpfs tempat segmen POSIX shared memory dibuat di Linux. Ukurannya terbatas
+# (64 MB secara default di Docker, atur dengan `docker run --shm-size`)
+SHM_DIR = '/dev/shm'
+
+ALIGNMENT = 64
+_HEADER = struct.Struct('<Q')
+
+logger = logging.getLogger(__name__)
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _check_free_space(size):
+    # Segmen dibuat dengan ftruncate tanpa alokasi, jadi tmpfs yang penuh baru
+    # ketahuan sebagai SIGBUS saat data ditulis. Periksa ruang kosong dulu.
+    try:
+        stat = os.statvfs(SHM_DIR)
+    except OSError:
+        return
+    free = stat.f_bavail * stat.f_frsize
+    if size > free:
+        raise OSError(errno.ENOSPC, f'Segmen {size / 1e6:.1f} MB tidak muat di {SHM_DIR} '
+                                    f'(sisa {free / 1e6:.1f} MB)')
+
+
+def _untrack(shm):
+    # Sebelum Python 3.13, proses yang hanya attach ikut mendaftarkan segmen ke
+    # resource tracker dan menghapusnya saat keluar. Pemiliknya supervisor.
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+class SharedArrays:
+    """Sekumpulan array NumPy dan metadata JSON dalam satu segmen shared memory.
+
+    Layout: panjang manifest (8 byte), manifest JSON (metadata, dtype, shape
+    dan offset setiap array), lalu data array yang disejajarkan 64 byte.
+    Proses lain cukup attach dengan nama segmen dan mendapat view read-only
+    tanpa menyalin data.
+    """
+
+    def __init__(self, shm, meta, arrays, owner):
+        self.shm = shm
+        self.meta = meta
+        self.arrays = arrays
+        self.owner = owner
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    @classmethod
+    def publish(cls, arrays, meta=None, prefix='ppi'):
+        from multiprocessing import shared_memory
+
+        layout = {}
+        offset = 0
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            offset = _align(offset)
+            layout[key] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += array.nbytes
+        manifest = json.dumps({'meta': meta or {}, 'arrays': layout}).encode()
+        data_start = _align(_HEADER.size + len(manifest))
+
+        size = max(1, data_start + offset)
+        _check_free_space(size)
+        name = f'{prefix}_{uuid.uuid4().hex[:16]}'
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, len(manifest))
+        shm.buf[_HEADER.size:_HEADER.size + len(manifest)] = manifest
+        views = {}
+        for key, array in arrays.items():
+            spec = layout[key]
+            view = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf,
+                              offset=data_start + spec['offset'])
+            view[...] = array
+            view.flags.writeable = False
+            views[key] = view
+        return cls(shm, meta or {}, views, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=name)
+        _untrack(shm)
+        (length,) = _HEADER.unpack_from(shm.buf, 0)
+        manifest = json.loads(bytes(shm.buf[_HEADER.size:_HEADER.size + length]))
+        data_start = _align(_HEADER.size + length)
+        views = {}
+        for key, spec in manifest['arrays'].items():
+            view = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf,
+                              offset=data_start + spec['offset'])
+            view.flags.writeable = False
+            views[key] = view
+        return cls(shm, manifest['meta'], views, owner=False)
+
+    def close(self):
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # Masih ada view yang dipakai, segmen dilepas saat proses keluar
+            pass
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+
+# Model terkompilasi
+
+def publish_model(compiled, info=None):
+    """Salin array runtime model terkompilasi ke shared memory.
+
+    `info` (versi, path dan mtime file model, waktu muat) disimpan di metadata
+    supaya worker bisa memeriksa apakah model di segmen masih model terbaru.
+    """
+    meta = {'model': compiled.meta(), **(info or {})}
+    return SharedArrays.publish(compiled.runtime_arrays(), meta, prefix='ppi_model')
+
+
+def model_from_shared(shared):
+    from compiled_model import CompiledModel
+    return CompiledModel.from_arrays(shared.meta['model'], shared.arrays)
+
+
+# Dataset
+
+def publish_dataset(df, source=None):
+    """Salin kolom-kolom bertipe dari `df` ke shared memory.
+
+    Kolom kategori (Categorical atau teks) disimpan sebagai kode int8/int16 dan
+    daftar kategorinya di metadata, kolom numerik dan boolean apa adanya.
+    """
+    import pandas as pd
+
+    arrays = {}
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            codes, categories = pd.factorize(values, sort=True)
+            dtype = np.int8 if len(categories) < 127 else np.int16 if len(categories) < 32767 else np.int32
+            arrays[col] = codes.astype(dtype)
+            columns.append({'name': col, 'categories': [str(c) for c in categories]})
+        else:
+            arrays[col] = values.to_numpy()
+            columns.append({'name': col})
+    meta = {'columns': columns, 'rows': len(df), 'source': None}
+    if source is not None:
+        meta['source'] = os.path.abspath(source)
+        meta['source_mtime_ns'] = os.stat(source).st_mtime_ns
+    return SharedArrays.publish(arrays, meta, prefix='ppi_data')
+
+
+def dataset_from_shared(shared, columns=None):
+    """DataFrame dari segmen dataset; kolom numerik adalah view tanpa salinan."""
+    import pandas as pd
+
+    data = {}
+    wanted = None if columns is None else set(columns)
+    for spec in shared.meta['columns']:
+        col = spec['name']
+        if wanted is not None and col not in wanted:
+            continue
+        values = shared.arrays[col]
+        if 'categories' in spec:
+            values = pd.Categorical.from_codes(values, spec['categories'])
+        data[col] = values
+    df = pd.DataFrame(data, copy=False)
+    return df if columns is None else df[list(dict.fromkeys(columns))]
+
+
+# File penunjuk segmen
+
+def write_pointer(path, names):
+    """Tulis nama segmen (env -> nama) ke `path` secara atomik."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.pointer_', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(names, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+_pointer = {'key': None, 'names': {}}
+
+
+def _segment_name(env):
+    path = os.environ.get(POINTER_ENV)
+    if not path:
+        return os.environ.get(env)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # Supervisor sudah berhenti atau belum mempublikasikan apa pun
+        return None
+    # File diganti lewat os.replace, inode dan mtime berubah setiap penulisan
+    key = (stat.st_ino, stat.st_mtime_ns)
+    if key != _pointer['key']:
+        try:
+            with open(path) as f:
+                names = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning('File penunjuk segmen %s tidak bisa dibaca: %s', path, exc)
+            return _pointer['names'].get(env)
+        _pointer.update(key=key, names=names)
+    return _pointer['names'].get(env)
+
+
+# Segmen yang di-attach proses ini (dari file penunjuk atau env yang diisi supervisor)
+
+_attached = {}
+_current = {}
+_models = {}
+_attached_lock = threading.Lock()
+
+
+def _attached_segment(env):
+    with _attached_lock:
+        name = _segment_name(env)
+        previous = _current.get(env)
+        if previous is not None and previous != name:
+            # Segmen lama sudah diganti supervisor. View yang masih dipakai
+            # request berjalan tetap valid, pemetaannya dilepas setelah itu.
+            old = _attached.pop(previous, None)
+            _models.pop(previous, None)
+            if old:
+                old.close()
+        _current[env] = name
+        if not name:
+            return None
+        shared = _attached.get(name)
+        if shared is None:
+            try:
+                shared = SharedArrays.attach(name)
+            except FileNotFoundError:
+                logger.warning('Segmen shared memory %s tidak ditemukan', name)
+                shared = False
+            _attached[name] = shared
+    return shared or None
+
+
+def shared_dataset(columns=None, source=None):
+    """Dataset dari shared memory jika tersedia dan masih sesuai dengan file `source`."""
+    shared = _attached_segment(DATASET_SEGMENT_ENV)
+    if shared is None:
+        return None
+    if source is not None:
+        meta = shared.meta
+        try:
+            fresh = (meta.get('source') == os.path.abspath(source)
+                     and os.stat(source).st_mtime_ns == meta.get('source_mtime_ns'))
+        except OSError:
+            fresh = False
+        if not fresh:
+            return None
+    available = {spec['name'] for spec in shared.meta['columns']}
+    if columns is not None and not set(columns) <= available:
+        return None
+    return dataset_from_shared(shared, columns)
+
+
+def _shared_compiled(shared):
+    with _attached_lock:
+        compiled = _models.get(shared.name)
+        if compiled is None:
+            compiled = model_from_shared(shared)
+            # Segmen yang sudah diganti di thread lain tidak disimpan lagi
+            if _current.get(MODEL_SEGMENT_ENV) == shared.name:
+                _models[shared.name] = compiled
+    return compiled
+
+
+def shared_model():
+    """Model terkompilasi dari shared memory (dibuat sekali per segmen), atau None."""
+    shared = _attached_segment(MODEL_SEGMENT_ENV)
+    if shared is None:
+        return None
+    return _shared_compiled(shared)
+
+
+def shared_model_snapshot(path=None):
+    """LoadedModel berisi model terkompilasi dari shared memory, atau None.
+
+    None jika tidak ada segmen model, atau file model sudah berubah sejak
+    segmen dibuat (pemanggil kembali ke ModelRegistry).
+    """
+    shared = _attached_segment(MODEL_SEGMENT_ENV)
+    if shared is None:
+        return None
+    from model_registry import MODEL_PATH, LoadedModel
+
+    compiled = _shared_compiled(shared)
+    info = shared.meta
+    path = path or MODEL_PATH
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if os.path.abspath(path) != info.get('path') or mtime_ns != info.get('mtime_ns'):
+        return None
+    return LoadedModel(compiled, info['version'], compiled.source_sha256, mtime_ns,
+                       info['load_seconds'], info['loaded_at'])
@@ -0,0 +1,82 @@
+import argparse
+import importlib
+import logging
+import os
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+PAGE_MODULES = ['home', 'eda', 'predict']
+HEAVY_MODULES = [
+    'streamlit', 'pandas', 'numpy', 'pyarrow', 'matplotlib.pyplot', 'seaborn',
+    'scipy.stats', 'sklearn', 'xgboost'
+]
+
+# Durasi import pertama tiap modul di proses ini (detik)
+_import_seconds = {}
+
+
+def timed_import(name):
+    """Impor modul saat pertama kali dibutuhkan dan catat lamanya."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+    _import_seconds[name] = elapsed
+    logger.info('Import %s: %.1f ms', name, elapsed * 1000)
+    return module
+
+
+def import_timings():
+    return dict(_import_seconds)
+
+
+def importtime_breakdown(module, cwd=None):
+    """Ukur cold import `module` di interpreter baru dengan `python -X importtime`.
+
+    Mengembalikan total waktu (detik) dan waktu `self` per paket top-level.
+    """
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Gagal mengimpor {module}: {result.stderr.strip().splitlines()[-1]}')
+
+    per_package = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        per_package[package] = per_package.get(package, 0.0) + int(self_us) / 1e6
+        if name.strip() == module:
+            total = int(cumulative_us) / 1e6
+    return total, per_package
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Laporan biaya import (cold start) per modul dashboard')
+    parser.add_argument('modules', nargs='*', default=PAGE_MODULES + HEAVY_MODULES)
+    parser.add_argument('--top', type=int, default=5, help='Jumlah paket terberat yang ditampilkan per modul')
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        try:
+            total, per_package = importtime_breakdown(module)
+        except RuntimeError as exc:
+            print(f'{module:<20} {exc}')
+            continue
+        terberat = sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        rincian = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in terberat)
+        print(f'{module:<20} {total * 1000:8.0f} ms  ({rincian})')
+
+
+if __name__ == '__main__':
+    main()
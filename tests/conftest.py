@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modul aplikasi berada langsung di src/ (dijalankan oleh Streamlit dari root repo)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+
+MODEL_PATH = os.environ.get('PARITY_MODEL_PATH', os.path.join(ROOT, 'src', 'model_terbaik.pkl'))
+CSV_PATH = os.path.join(ROOT, 'src', 'ecommerce_purchasing_intention.csv')
+
+
+def _lfs_pointer(path):
+    with open(path, 'rb') as f:
+        return f.read(40).startswith(b'version https://git-lfs')
+
+
+@pytest.fixture(scope='module')
+def pipeline_and_compiled():
+    pytest.importorskip('xgboost')
+    if not os.path.exists(MODEL_PATH) or _lfs_pointer(MODEL_PATH):
+        pytest.skip('model_terbaik.pkl belum diunduh dari Git LFS')
+    from compiled_model import export_pipeline
+    from model_registry import ModelRegistry, file_sha256
+
+    pipeline = ModelRegistry(MODEL_PATH).get()
+    return pipeline, export_pipeline(pipeline, file_sha256(MODEL_PATH))
+
+
+def test_parity_on_dataset(pipeline_and_compiled):
+    import pandas as pd
+    from compiled_model import verify_parity
+
+    pipeline, compiled = pipeline_and_compiled
+    result = verify_parity(pipeline, compiled, pd.read_csv(CSV_PATH))
+    assert result['label_mismatch'] == 0
+    assert result['max_abs_proba_diff'] < 1e-5
+    assert result['max_abs_proba_diff_single'] < 1e-5
+
+
+def test_save_load_roundtrip(pipeline_and_compiled, tmp_path):
+    import pandas as pd
+    from compiled_model import CompiledModel
+    from model_registry import FEATURE_COLUMNS
+
+    _, compiled = pipeline_and_compiled
+    path = str(tmp_path / 'model_compiled.npz')
+    compiled.save(path)
+    loaded = CompiledModel.load(path)
+    X = pd.read_csv(CSV_PATH, nrows=500)[FEATURE_COLUMNS]
+    assert loaded.source_sha256 == compiled.source_sha256
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
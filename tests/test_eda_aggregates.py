@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, pointbiserialr
+
+from conftest import ROOT
+from eda_aggregates import CAT_FEATURES, NUM_FEATURES, AggregateStore, cramers_v_table, point_biserial_table
+
+CSV_PATH = os.path.join(ROOT, 'src', 'ecommerce_purchasing_intention.csv')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return pd.read_csv(CSV_PATH)
+
+
+@pytest.fixture(scope='module')
+def store():
+    store = AggregateStore(CSV_PATH)
+    store.refresh()
+    return store
+
+
+def test_point_biserial_matches_scipy(df, store):
+    table = point_biserial_table(store).set_index('Fitur')
+    assert sorted(table.index) == sorted(NUM_FEATURES)
+    for col in NUM_FEATURES:
+        r, p = pointbiserialr(df['Revenue'], df[col])
+        np.testing.assert_allclose(table.loc[col, 'Tingkat signifikasi'], r, rtol=1e-10)
+        np.testing.assert_allclose(table.loc[col, 'P-value'], p, rtol=1e-8, atol=1e-300)
+
+
+def test_cramers_v_matches_scipy(df, store):
+    table = cramers_v_table(store).set_index('Fitur')
+    assert sorted(table.index) == sorted(CAT_FEATURES)
+    for col in CAT_FEATURES:
+        contingency = pd.crosstab(df[col], df['Revenue'])
+        chi2, p, dof, _ = chi2_contingency(contingency)
+        n = contingency.to_numpy().sum()
+        v = np.sqrt(chi2 / (n * (min(contingency.shape) - 1)))
+        np.testing.assert_allclose(table.loc[col, "Cramer's V"], v, rtol=1e-10)
+        np.testing.assert_allclose(table.loc[col, 'P-value'], p, rtol=1e-8, atol=1e-300)
+
+
+def test_weekend_uses_yates_correction(df, store):
+    # Weekend x Revenue adalah tabel 2x2 (dof 1): scipy menerapkan koreksi Yates
+    contingency = pd.crosstab(df['Weekend'], df['Revenue'])
+    corrected = chi2_contingency(contingency, correction=True)
+    uncorrected = chi2_contingency(contingency, correction=False)
+    assert corrected[2] == 1 and corrected[1] != pytest.approx(uncorrected[1], rel=1e-6)
+    p = cramers_v_table(store).set_index('Fitur').loc['Weekend', 'P-value']
+    np.testing.assert_allclose(p, corrected[1], rtol=1e-8)
+
+
+def test_parallel_refresh_matches_serial(store):
+    parallel = AggregateStore(CSV_PATH)
+    assert parallel.refresh(workers=2) == store.rows
+    assert parallel.rows == store.rows and parallel.offset == store.offset
+    for name in ('mean_x', 'm2_x', 'c_xy', 'mean_y', 'm2_y'):
+        np.testing.assert_allclose(getattr(parallel, name), getattr(store, name), rtol=1e-10)
+    assert parallel.counts.keys() == store.counts.keys()
+    for group, counts in store.counts.items():
+        pd.testing.assert_series_equal(parallel.counts[group].sort_index(), counts.sort_index(), check_names=False)
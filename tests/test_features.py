@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from conftest import ROOT
+from features import dominant_section, engagement_features
+
+CSV_PATH = os.path.join(ROOT, 'src', 'ecommerce_purchasing_intention.csv')
+
+
+def _dominant_section_rowwise(df):
+    # Versi per baris sebelum vektorisasi (apply + max atas dict)
+    eda3 = df.copy()
+    eda3['Admin_Engagement'] = eda3['Administrative'] + eda3['Administrative_Duration']
+    eda3['Info_Engagement'] = eda3['Informational'] + eda3['Informational_Duration']
+    eda3['Product_Engagement'] = eda3['ProductRelated'] + eda3['ProductRelated_Duration']
+
+    def dominant(row):
+        sections = {
+            'Administrative': row['Admin_Engagement'],
+            'Informational': row['Info_Engagement'],
+            'ProductRelated': row['Product_Engagement']
+        }
+        return max(sections, key=sections.get)
+
+    return eda3.apply(dominant, axis=1).to_numpy()
+
+
+def test_dominant_section_matches_rowwise_on_dataset():
+    df = pd.read_csv(CSV_PATH)
+    np.testing.assert_array_equal(dominant_section(engagement_features(df)), _dominant_section_rowwise(df))
+
+
+def test_dominant_section_ties_pick_first_section():
+    # Nilai engagement: (Administrative, Informational, ProductRelated)
+    engagement = [(0, 0, 0), (5, 5, 1), (1, 5, 5), (5, 1, 5), (2, 2, 2), (0, 0, 3), (3.5, 3.5, 3.5)]
+    df = pd.DataFrame({
+        'Administrative': [a for a, _, _ in engagement], 'Administrative_Duration': 0.0,
+        'Informational': [i for _, i, _ in engagement], 'Informational_Duration': 0.0,
+        'ProductRelated': [p for _, _, p in engagement], 'ProductRelated_Duration': 0.0
+    })
+    expected = _dominant_section_rowwise(df)
+    np.testing.assert_array_equal(dominant_section(engagement_features(df)), expected)
+    assert list(expected) == ['Administrative', 'Administrative', 'Informational', 'Administrative',
+                              'Administrative', 'ProductRelated', 'Administrative']
+
+
+def test_dominant_section_table_matches_rowwise():
+    from eda import dominant_section_table
+
+    df = pd.read_csv(CSV_PATH)
+    table = dominant_section_table(df)
+    aktif = df['PageValues'] > 0
+    np.testing.assert_array_equal(table['DominantSection'].to_numpy(), _dominant_section_rowwise(df)[aktif.to_numpy()])
+    pd.testing.assert_index_equal(table.index, df.index[aktif])